@@ -1,3 +1,3 @@
-from .apiServer import ApiServer
+from .apiServer import ApiServer, createApp
 
-__all__ = ['ApiServer']
+__all__ = ['ApiServer', 'createApp']
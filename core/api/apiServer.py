@@ -1,14 +1,23 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
 from typing import Dict, Any, List, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import asyncio
+import logging
+import os
 import time
 import uuid
 from datetime import datetime
 
 from core.modelRegistry.modelManager import ModelManager
-from core.modelRegistry.baseModel import PredictionInput, PredictionOutput
+from core.modelRegistry.baseModel import (
+    PredictionInput, PredictionOutput, ModelMetadata
+)
 from core.auth.apiKeyManager import ApiKeyManager, ApiKey
 from core.auth.authMiddleware import AuthMiddleware
 from core.database.databaseManager import DatabaseManager
@@ -31,12 +40,35 @@ class CreateApiKeyRequest(BaseModel):
     expiresInDays: Optional[int] = None
     rateLimit: int = 1000
 
+_MODEL_LIST_ADAPTER = TypeAdapter(List[ModelMetadata])
+_DEPLOYMENT_LIST_ADAPTER = TypeAdapter(List[Deployment])
+_API_KEY_LIST_ADAPTER = TypeAdapter(List[ApiKey])
+
+_FLUSH_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+BEARER_SCHEME = HTTPBearer()
+SECURITY_DEP = Depends(BEARER_SCHEME)
+
+def _listResponse(key: str, adapter: TypeAdapter, items: List[Any],
+                  headers: Optional[Dict[str, str]] = None, **dumpOptions) -> Response:
+    body = b'{"' + key.encode() + b'":' + adapter.dump_json(items, **dumpOptions) + b'}'
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@lru_cache(maxsize=1)
+def _isoTimestamp(epochSecond: int) -> str:
+    return datetime.fromtimestamp(epochSecond).isoformat()
+
 class ApiServer:
-    def __init__(self, pluginsPath: str = "plugins", dbPath: str = "data/db"):
+    def __init__(self, pluginsPath: str = "plugins", dbPath: str = "data/db",
+                 flushBatchSize: int = 500, flushIntervalMs: float = 200,
+                 predictWorkers: Optional[int] = None, serverWorkers: int = 1):
         self.app = FastAPI(
             title="CloudEasyML",
             description="Plug-and-play ML model deployment platform",
-            version="1.0.0"
+            version="1.0.0",
+            default_response_class=ORJSONResponse
         )
 
         self.app.add_middleware(
@@ -51,32 +83,116 @@ class ApiServer:
         self.modelManager = ModelManager(pluginsPath)
         self.modelManager.loadAllPlugins()
         self.apiKeyManager = ApiKeyManager(self.db)
-        self.authMiddleware = AuthMiddleware(self.apiKeyManager)
+        self.authMiddleware = AuthMiddleware(self.apiKeyManager, serverWorkers)
         self.pricingEngine = PricingEngine()
         self.usageTracker = UsageTracker(self.db, self.pricingEngine)
 
-        self.security = HTTPBearer()
+        self.flushBatchSize = flushBatchSize
+        self.flushInterval = flushIntervalMs / 1000.0
+        self._writeQueue: Optional[asyncio.Queue] = None
+        self._flushTask: Optional[asyncio.Task] = None
+        self._predictPool = ThreadPoolExecutor(
+            max_workers=predictWorkers or (os.cpu_count() or 1) * 2
+        )
+
+        self.security = BEARER_SCHEME
+        self._setupLifecycle()
         self._setupRoutes()
 
+    def _setupLifecycle(self) -> None:
+        @self.app.on_event("startup")
+        async def startWriteFlusher():
+            self._writeQueue = asyncio.Queue()
+            self._flushTask = asyncio.create_task(self._flushLoop())
+
+        @self.app.on_event("shutdown")
+        async def stopWriteFlusher():
+            if self._flushTask:
+                self._writeQueue.put_nowait(_FLUSH_STOP)
+                await self._flushTask
+            pending = []
+            while self._writeQueue and not self._writeQueue.empty():
+                pending.append(self._writeQueue.get_nowait())
+            self._writeQueue = None
+            if pending:
+                try:
+                    self._flushWrites(pending)
+                except Exception:
+                    logger.exception("Dropped %d writes at shutdown", len(pending))
+            self._predictPool.shutdown(wait=False)
+
+    def _enqueueWrite(self, kind: str, payload: Any) -> None:
+        if self._writeQueue is None:
+            self._flushWrites([(kind, payload)])
+        else:
+            self._writeQueue.put_nowait((kind, payload))
+
+    async def _flushLoop(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._writeQueue.get()
+            if item is _FLUSH_STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self.flushInterval
+
+            while len(batch) < self.flushBatchSize:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._writeQueue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _FLUSH_STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                await asyncio.to_thread(self._flushWrites, batch)
+            except Exception:
+                logger.exception("Failed to flush %d writes, requeueing", len(batch))
+                for item in batch:
+                    self._writeQueue.put_nowait(item)
+                if not stopping:
+                    await asyncio.sleep(self.flushInterval)
+
+    def _flushWrites(self, batch: List[tuple]) -> None:
+        records = [payload for kind, payload in batch if kind == "usage"]
+        counts = Counter(payload for kind, payload in batch if kind == "incr")
+
+        self.db.saveUsageRecords(records)
+        self.db.incrementApiKeyUsageBatch(dict(counts))
+
     def _setupRoutes(self) -> None:
         @self.app.get("/health")
         async def healthCheck():
-            return {
-                "status": "healthy",
-                "timestamp": datetime.now().isoformat(),
-                "modelsLoaded": len(self.modelManager.registeredModels)
-            }
+            return ORJSONResponse(
+                content={
+                    "status": "healthy",
+                    "timestamp": _isoTimestamp(int(time.time())),
+                    "modelsLoaded": len(self.modelManager.registeredModels)
+                },
+                headers={"Cache-Control": "max-age=1"}
+            )
 
         @self.app.get("/models")
-        async def listModels():
-            return {
-                "models": [m.dict() for m in self.modelManager.listModels()]
-            }
+        async def listModels(request: Request):
+            etag = self.modelManager.modelsEtag
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers={"ETag": etag})
+
+            return _listResponse(
+                "models", _MODEL_LIST_ADAPTER, self.modelManager.listModels(),
+                headers={"ETag": etag}
+            )
 
         @self.app.post("/deployments")
         async def createDeployment(
             request: CreateDeploymentRequest,
-            credentials: HTTPAuthorizationCredentials = Depends(self.security)
+            credentials: HTTPAuthorizationCredentials = SECURITY_DEP
         ):
             apiKey = await self.authMiddleware.authenticate(credentials)
 
@@ -93,25 +209,23 @@ class ApiServer:
             self.db.saveDeployment(deployment)
 
             return {
-                "deployment": deployment.dict(),
+                "deployment": deployment.model_dump(mode="json"),
                 "message": "Deployment created successfully"
             }
 
         @self.app.get("/deployments")
         async def listDeployments(
-            credentials: HTTPAuthorizationCredentials = Depends(self.security)
+            credentials: HTTPAuthorizationCredentials = SECURITY_DEP
         ):
             apiKey = await self.authMiddleware.authenticate(credentials)
             deployments = self.db.getUserDeployments(apiKey.userId)
 
-            return {
-                "deployments": [d.dict() for d in deployments]
-            }
+            return _listResponse("deployments", _DEPLOYMENT_LIST_ADAPTER, deployments)
 
         @self.app.post("/predict")
         async def predict(
             request: PredictRequest,
-            credentials: HTTPAuthorizationCredentials = Depends(self.security)
+            credentials: HTTPAuthorizationCredentials = SECURITY_DEP
         ):
             apiKey = await self.authMiddleware.authenticate(credentials)
 
@@ -145,19 +259,26 @@ class ApiServer:
                 options=request.options
             )
 
-            result = model.predict(predictionInput)
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._predictPool, model.predict, predictionInput
+            )
             processingTimeMs = (time.time() - startTime) * 1000
 
-            self.usageTracker.trackRequest(
+            record = self.usageTracker.createRecord(
                 userId=apiKey.userId,
                 deploymentId=deployment.deploymentId,
                 modelName=deployment.modelName,
                 processingTimeMs=processingTimeMs
             )
 
-            self.apiKeyManager.incrementUsage(apiKey.keyId)
+            self._enqueueWrite("usage", record)
+            self._enqueueWrite("incr", apiKey.keyId)
 
-            return result.dict()
+            return ORJSONResponse(content={
+                "predictions": result.predictions,
+                "metadata": result.metadata,
+                "processingTimeMs": result.processingTimeMs
+            })
 
         @self.app.post("/api-keys")
         async def createApiKey(
@@ -174,25 +295,26 @@ class ApiServer:
 
             return {
                 "apiKey": fullKey,
-                "metadata": apiKey.dict(exclude={'keyHash'}),
+                "metadata": apiKey.model_dump(mode="json", exclude={'keyHash'}),
                 "warning": "Save this key securely. It won't be shown again."
             }
 
         @self.app.get("/api-keys")
         async def listApiKeys(
-            credentials: HTTPAuthorizationCredentials = Depends(self.security)
+            credentials: HTTPAuthorizationCredentials = SECURITY_DEP
         ):
             apiKey = await self.authMiddleware.authenticate(credentials)
             keys = self.apiKeyManager.listKeys(apiKey.userId)
 
-            return {
-                "apiKeys": [k.dict(exclude={'keyHash'}) for k in keys]
-            }
+            return _listResponse(
+                "apiKeys", _API_KEY_LIST_ADAPTER, keys,
+                exclude={'__all__': {'keyHash'}}
+            )
 
         @self.app.delete("/api-keys/{keyId}")
         async def revokeApiKey(
             keyId: str,
-            credentials: HTTPAuthorizationCredentials = Depends(self.security)
+            credentials: HTTPAuthorizationCredentials = SECURITY_DEP
         ):
             apiKey = await self.authMiddleware.authenticate(credentials)
             success = self.apiKeyManager.revokeKey(keyId)
@@ -207,7 +329,7 @@ class ApiServer:
 
         @self.app.get("/usage")
         async def getUsage(
-            credentials: HTTPAuthorizationCredentials = Depends(self.security),
+            credentials: HTTPAuthorizationCredentials = SECURITY_DEP,
             startDate: Optional[str] = None,
             endDate: Optional[str] = None
         ):
@@ -217,8 +339,29 @@ class ApiServer:
             end = datetime.fromisoformat(endDate) if endDate else None
 
             usage = self.usageTracker.getUserCosts(apiKey.userId, start, end)
-            return usage
+            return ORJSONResponse(content=usage)
 
-    def run(self, host: str = "0.0.0.0", port: int = 8000):
+    def run(self, host: str = "0.0.0.0", port: int = 8000,
+            workers: Optional[int] = None):
         import uvicorn
-        uvicorn.run(self.app, host=host, port=port)
+        workers = workers or (2 * (os.cpu_count() or 1)) + 1
+        os.environ["CLOUDEASYML_PLUGINS_PATH"] = str(self.modelManager.pluginsPath)
+        os.environ["CLOUDEASYML_DB_PATH"] = str(self.db.dbPath)
+        os.environ["CLOUDEASYML_WORKERS"] = str(workers)
+        uvicorn.run(
+            "core.api.apiServer:createApp",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            loop="uvloop",
+            http="httptools"
+        )
+
+def createApp() -> FastAPI:
+    server = ApiServer(
+        pluginsPath=os.environ.get("CLOUDEASYML_PLUGINS_PATH", "plugins"),
+        dbPath=os.environ.get("CLOUDEASYML_DB_PATH", "data/db"),
+        serverWorkers=int(os.environ.get("CLOUDEASYML_WORKERS", "1"))
+    )
+    return server.app
@@ -2,8 +2,12 @@ from typing import Optional, Dict
 from datetime import datetime, timedelta
 import secrets
 import hashlib
+import hmac
+from cachetools import TTLCache
 from pydantic import BaseModel
 
+_BLAKE2B_PREFIX = "blake2b$"
+
 class ApiKey(BaseModel):
     keyId: str
     keyHash: str
@@ -17,8 +21,9 @@ class ApiKey(BaseModel):
     usageCount: int = 0
 
 class ApiKeyManager:
-    def __init__(self, database):
+    def __init__(self, database, cacheSize: int = 10_000, cacheTtl: float = 5):
         self.db = database
+        self._keyCache: TTLCache = TTLCache(maxsize=cacheSize, ttl=cacheTtl)
 
     def generateKey(self, userId: str, name: str,
                    expiresInDays: Optional[int] = None,
@@ -28,7 +33,7 @@ class ApiKeyManager:
         keySecret = secrets.token_urlsafe(32)
         fullKey = f"{keyId}.{keySecret}"
 
-        keyHash = hashlib.sha256(keySecret.encode()).hexdigest()
+        keyHash = self._hashSecret(keySecret)
 
         expiresAt = None
         if expiresInDays:
@@ -51,13 +56,15 @@ class ApiKeyManager:
     def validateKey(self, fullKey: str) -> Optional[ApiKey]:
         try:
             keyId, keySecret = fullKey.split('.')
-            keyHash = hashlib.sha256(keySecret.encode()).hexdigest()
 
-            apiKey = self.db.getApiKey(keyId)
-            if not apiKey:
-                return None
+            apiKey = self._keyCache.get(keyId)
+            if apiKey is None:
+                apiKey = self.db.getApiKey(keyId)
+                if not apiKey:
+                    return None
+                self._keyCache[keyId] = apiKey
 
-            if apiKey.keyHash != keyHash:
+            if not self._verifySecret(keySecret, apiKey.keyHash):
                 return None
 
             if not apiKey.isActive:
@@ -70,10 +77,24 @@ class ApiKeyManager:
         except:
             return None
 
-    def incrementUsage(self, keyId: str) -> None:
-        self.db.incrementApiKeyUsage(keyId)
+    @staticmethod
+    def _hashSecret(keySecret: str) -> str:
+        digest = hashlib.blake2b(keySecret.encode(), digest_size=32).hexdigest()
+        return f"{_BLAKE2B_PREFIX}{digest}"
+
+    @classmethod
+    def _verifySecret(cls, keySecret: str, keyHash: str) -> bool:
+        if keyHash.startswith(_BLAKE2B_PREFIX):
+            candidate = cls._hashSecret(keySecret)
+        else:
+            candidate = hashlib.sha256(keySecret.encode()).hexdigest()
+        return hmac.compare_digest(keyHash, candidate)
+
+    def incrementUsage(self, keyId: str, count: int = 1) -> None:
+        self.db.incrementApiKeyUsage(keyId, count)
 
     def revokeKey(self, keyId: str) -> bool:
+        self._keyCache.pop(keyId, None)
         return self.db.revokeApiKey(keyId)
 
     def listKeys(self, userId: str) -> list[ApiKey]:
@@ -1,12 +1,15 @@
 from fastapi import Request, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional
+from typing import Optional, Dict, Tuple
+import time
 from .apiKeyManager import ApiKeyManager, ApiKey
 
 class AuthMiddleware:
-    def __init__(self, apiKeyManager: ApiKeyManager):
+    def __init__(self, apiKeyManager: ApiKeyManager, workerCount: int = 1):
         self.apiKeyManager = apiKeyManager
+        self.workerCount = max(1, workerCount)
         self.security = HTTPBearer()
+        self.buckets: Dict[str, Tuple[float, float]] = {}
 
     async def authenticate(self, credentials: HTTPAuthorizationCredentials) -> ApiKey:
         if not credentials:
@@ -28,4 +31,16 @@ class AuthMiddleware:
         return apiKey.permissions.get(permission, False)
 
     def checkRateLimit(self, apiKey: ApiKey) -> bool:
-        return apiKey.usageCount < apiKey.rateLimit
+        now = time.monotonic()
+        capacity = max(1.0, apiKey.rateLimit / self.workerCount)
+        refillRate = capacity / 60.0
+
+        tokens, lastRefill = self.buckets.get(apiKey.keyId, (capacity, now))
+        tokens = min(capacity, tokens + (now - lastRefill) * refillRate)
+
+        if tokens < 1:
+            self.buckets[apiKey.keyId] = (tokens, now)
+            return False
+
+        self.buckets[apiKey.keyId] = (tokens - 1, now)
+        return True
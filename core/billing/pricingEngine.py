@@ -1,8 +1,17 @@
-from typing import Dict
+from typing import Dict, Tuple
 
 class PricingEngine:
     def __init__(self, pricingConfig: Dict[str, Dict] = None):
         self.pricingConfig = pricingConfig or self._getDefaultPricing()
+        self._fastPricing: Dict[str, Tuple[float, float, float]] = {}
+        self._rebuildFastPricing()
+
+    def _rebuildFastPricing(self) -> None:
+        self._fastPricing = {
+            name: (p['perRequest'], p['perSecond'], p['perGpuHour'])
+            for name, p in self.pricingConfig.items()
+        }
+        self._defaultTuple = self._fastPricing['default']
 
     def _getDefaultPricing(self) -> Dict[str, Dict]:
         return {
@@ -20,19 +29,16 @@ class PricingEngine:
 
     def calculateCost(self, modelName: str, processingTimeMs: float,
                      requestCount: int = 1, gpuHours: float = 0) -> float:
-        pricing = self.pricingConfig.get(
-            modelName,
-            self.pricingConfig['default']
+        perRequest, perSecond, perGpuHour = self._fastPricing.get(
+            modelName, self._defaultTuple
         )
-
-        requestCost = pricing['perRequest'] * requestCount
-        timeCost = pricing['perSecond'] * (processingTimeMs / 1000.0)
-        gpuCost = pricing['perGpuHour'] * gpuHours
-
-        return requestCost + timeCost + gpuCost
+        return (perRequest * requestCount
+                + perSecond * processingTimeMs * 0.001
+                + perGpuHour * gpuHours)
 
     def updatePricing(self, modelName: str, pricing: Dict[str, float]) -> None:
         self.pricingConfig[modelName] = pricing
+        self._rebuildFastPricing()
 
     def getPricing(self, modelName: str = None) -> Dict:
         if modelName:
@@ -12,13 +12,26 @@ class UsageTracker:
     def trackRequest(self, userId: str, deploymentId: str,
                     modelName: str, processingTimeMs: float,
                     metadata: Dict[str, Any] = {}) -> UsageRecord:
+        record = self.createRecord(
+            userId=userId,
+            deploymentId=deploymentId,
+            modelName=modelName,
+            processingTimeMs=processingTimeMs,
+            metadata=metadata
+        )
+        self.db.saveUsageRecord(record)
+        return record
+
+    def createRecord(self, userId: str, deploymentId: str,
+                     modelName: str, processingTimeMs: float,
+                     metadata: Dict[str, Any] = {}) -> UsageRecord:
         cost = self.pricingEngine.calculateCost(
             modelName=modelName,
             processingTimeMs=processingTimeMs,
             requestCount=1
         )
 
-        record = UsageRecord(
+        return UsageRecord(
             recordId=str(uuid.uuid4()),
             userId=userId,
             deploymentId=deploymentId,
@@ -28,28 +41,22 @@ class UsageTracker:
             metadata=metadata
         )
 
-        self.db.saveUsageRecord(record)
-        return record
-
     def getUserCosts(self, userId: str, startDate: datetime = None,
                     endDate: datetime = None) -> Dict[str, Any]:
-        records = self.db.getUserUsage(userId, startDate, endDate)
+        rollup = self.db.getUserUsageRollup(userId, startDate, endDate)
 
-        totalCost = sum(r.cost for r in records)
-        totalRequests = len(records)
-        totalProcessingTime = sum(r.processingTimeMs for r in records)
+        byModel = {
+            row['modelName']: {
+                'requests': row['requests'],
+                'cost': row['cost'],
+                'processingTimeMs': row['processingTimeMs']
+            }
+            for row in rollup
+        }
 
-        byModel = {}
-        for record in records:
-            if record.modelName not in byModel:
-                byModel[record.modelName] = {
-                    'requests': 0,
-                    'cost': 0.0,
-                    'processingTimeMs': 0.0
-                }
-            byModel[record.modelName]['requests'] += 1
-            byModel[record.modelName]['cost'] += record.cost
-            byModel[record.modelName]['processingTimeMs'] += record.processingTimeMs
+        totalCost = sum(m['cost'] for m in byModel.values())
+        totalRequests = sum(m['requests'] for m in byModel.values())
+        totalProcessingTime = sum(m['processingTimeMs'] for m in byModel.values())
 
         return {
             'userId': userId,
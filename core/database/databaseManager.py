@@ -1,115 +1,295 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import json
+import sqlite3
+import threading
 from pathlib import Path
 from .models import User, Deployment, UsageRecord
 from core.auth.apiKeyManager import ApiKey
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    userId TEXT PRIMARY KEY,
+    json_blob TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS api_keys (
+    keyId TEXT PRIMARY KEY,
+    userId TEXT NOT NULL,
+    keyHash TEXT NOT NULL,
+    isActive INTEGER NOT NULL,
+    expiresAt REAL,
+    usageCount INTEGER NOT NULL DEFAULT 0,
+    rateLimit INTEGER NOT NULL,
+    json_blob TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_api_keys_userId ON api_keys(userId);
+CREATE TABLE IF NOT EXISTS deployments (
+    deploymentId TEXT PRIMARY KEY,
+    userId TEXT NOT NULL,
+    json_blob TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_deployments_userId ON deployments(userId);
+CREATE TABLE IF NOT EXISTS usage (
+    recordId TEXT PRIMARY KEY,
+    userId TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    modelName TEXT NOT NULL,
+    cost REAL NOT NULL,
+    processingTimeMs REAL NOT NULL,
+    json_blob TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_usage_userId_timestamp ON usage(userId, timestamp);
+CREATE TABLE IF NOT EXISTS usage_rollup (
+    userId TEXT NOT NULL,
+    modelName TEXT NOT NULL,
+    day TEXT NOT NULL,
+    requests INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    processingTimeMs REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (userId, modelName, day)
+);
+"""
+
+_USER_VALUES = "users (userId, json_blob) VALUES (?, ?)"
+_API_KEY_VALUES = (
+    "api_keys (keyId, userId, keyHash, isActive, expiresAt, usageCount, "
+    "rateLimit, json_blob) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_DEPLOYMENT_VALUES = "deployments (deploymentId, userId, json_blob) VALUES (?, ?, ?)"
+_USAGE_VALUES = (
+    "usage (recordId, userId, timestamp, modelName, cost, processingTimeMs, "
+    "json_blob) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_ROLLUP_UPSERT = (
+    "INSERT INTO usage_rollup (userId, modelName, day, requests, "
+    "cost, processingTimeMs) VALUES (?, ?, ?, 1, ?, ?) "
+    "ON CONFLICT (userId, modelName, day) DO UPDATE SET "
+    "requests = requests + 1, cost = cost + excluded.cost, "
+    "processingTimeMs = processingTimeMs + excluded.processingTimeMs"
+)
+
 class DatabaseManager:
-    def __init__(self, dbPath: str = "data/db"):
+    def __init__(self, dbPath: str = "data/db", busyTimeoutMs: int = 5000):
         self.dbPath = Path(dbPath)
         self.dbPath.mkdir(parents=True, exist_ok=True)
-        self.usersPath = self.dbPath / "users.json"
-        self.apiKeysPath = self.dbPath / "apiKeys.json"
-        self.deploymentsPath = self.dbPath / "deployments.json"
-        self.usagePath = self.dbPath / "usage.json"
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            self.dbPath / "app.db",
+            timeout=busyTimeoutMs / 1000.0,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+        self._importLegacyJson()
+
+    def _execute(self, query: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self.conn.execute(query, params).rowcount
+
+    def _executeTransaction(self, statements: List[tuple]) -> None:
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for query, rows in statements:
+                    self.conn.executemany(query, rows)
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
 
-        self._initializeFiles()
+    def _fetchOne(self, query: str, params: tuple = ()) -> Optional[tuple]:
+        with self._lock:
+            return self.conn.execute(query, params).fetchone()
 
-    def _initializeFiles(self) -> None:
-        for path in [self.usersPath, self.apiKeysPath,
-                     self.deploymentsPath, self.usagePath]:
+    def _fetchAll(self, query: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self.conn.execute(query, params).fetchall()
+
+    def _importLegacyJson(self) -> None:
+        legacyFiles = [
+            ("users.json", User, _USER_VALUES, self._userParams),
+            ("apiKeys.json", ApiKey, _API_KEY_VALUES, self._apiKeyParams),
+            ("deployments.json", Deployment, _DEPLOYMENT_VALUES,
+             self._deploymentParams),
+            ("usage.json", UsageRecord, _USAGE_VALUES, self._usageParams),
+        ]
+        for fileName, modelClass, values, toParams in legacyFiles:
+            path = self.dbPath / fileName
             if not path.exists():
-                path.write_text("[]")
+                continue
+            with self._lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    rows = json.loads(path.read_text()) if path.exists() else []
+                    for row in rows:
+                        item = modelClass(**row)
+                        inserted = self.conn.execute(
+                            "INSERT OR IGNORE INTO " + values, toParams(item)
+                        ).rowcount
+                        if inserted and modelClass is UsageRecord:
+                            self.conn.execute(_ROLLUP_UPSERT, self._rollupParams(item))
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+                self.conn.execute("COMMIT")
+            try:
+                path.rename(path.with_suffix(".json.migrated"))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _toTimestamp(value: Optional[datetime]) -> Optional[float]:
+        return value.timestamp() if value else None
+
+    @staticmethod
+    def _userParams(user: User) -> tuple:
+        return (user.userId, user.model_dump_json())
+
+    @classmethod
+    def _apiKeyParams(cls, apiKey: ApiKey) -> tuple:
+        return (apiKey.keyId, apiKey.userId, apiKey.keyHash, int(apiKey.isActive),
+                cls._toTimestamp(apiKey.expiresAt), apiKey.usageCount,
+                apiKey.rateLimit, apiKey.model_dump_json())
+
+    @staticmethod
+    def _deploymentParams(deployment: Deployment) -> tuple:
+        return (deployment.deploymentId, deployment.userId,
+                deployment.model_dump_json())
 
-    def _readJson(self, path: Path) -> List[Dict]:
-        return json.loads(path.read_text())
+    @staticmethod
+    def _usageParams(record: UsageRecord) -> tuple:
+        return (record.recordId, record.userId, record.timestamp.timestamp(),
+                record.modelName, record.cost, record.processingTimeMs,
+                record.model_dump_json())
 
-    def _writeJson(self, path: Path, data: List[Dict]) -> None:
-        path.write_text(json.dumps(data, indent=2, default=str))
+    @staticmethod
+    def _rollupParams(record: UsageRecord) -> tuple:
+        return (record.userId, record.modelName, record.timestamp.date().isoformat(),
+                record.cost, record.processingTimeMs)
+
+    @staticmethod
+    def _rowToApiKey(row: tuple) -> ApiKey:
+        apiKey = ApiKey.model_validate_json(row[0])
+        apiKey.isActive = bool(row[1])
+        apiKey.usageCount = row[2]
+        return apiKey
 
     def saveUser(self, user: User) -> None:
-        users = self._readJson(self.usersPath)
-        users = [u for u in users if u['userId'] != user.userId]
-        users.append(user.dict())
-        self._writeJson(self.usersPath, users)
+        self._execute("INSERT OR REPLACE INTO " + _USER_VALUES, self._userParams(user))
 
     def getUser(self, userId: str) -> Optional[User]:
-        users = self._readJson(self.usersPath)
-        for user in users:
-            if user['userId'] == userId:
-                return User(**user)
-        return None
+        row = self._fetchOne(
+            "SELECT json_blob FROM users WHERE userId = ?", (userId,)
+        )
+        return User.model_validate_json(row[0]) if row else None
 
     def saveApiKey(self, apiKey: ApiKey) -> None:
-        keys = self._readJson(self.apiKeysPath)
-        keys = [k for k in keys if k['keyId'] != apiKey.keyId]
-        keys.append(apiKey.dict())
-        self._writeJson(self.apiKeysPath, keys)
+        self._execute(
+            "INSERT OR REPLACE INTO " + _API_KEY_VALUES, self._apiKeyParams(apiKey)
+        )
 
     def getApiKey(self, keyId: str) -> Optional[ApiKey]:
-        keys = self._readJson(self.apiKeysPath)
-        for key in keys:
-            if key['keyId'] == keyId:
-                return ApiKey(**key)
-        return None
-
-    def incrementApiKeyUsage(self, keyId: str) -> None:
-        keys = self._readJson(self.apiKeysPath)
-        for key in keys:
-            if key['keyId'] == keyId:
-                key['usageCount'] = key.get('usageCount', 0) + 1
-        self._writeJson(self.apiKeysPath, keys)
+        row = self._fetchOne(
+            "SELECT json_blob, isActive, usageCount FROM api_keys WHERE keyId = ?",
+            (keyId,)
+        )
+        return self._rowToApiKey(row) if row else None
+
+    def incrementApiKeyUsage(self, keyId: str, count: int = 1) -> None:
+        self.incrementApiKeyUsageBatch({keyId: count})
+
+    def incrementApiKeyUsageBatch(self, counts: Dict[str, int]) -> None:
+        if not counts:
+            return
+        self._executeTransaction([
+            (
+                "UPDATE api_keys SET usageCount = usageCount + ? WHERE keyId = ?",
+                [(count, keyId) for keyId, count in counts.items()]
+            ),
+        ])
 
     def revokeApiKey(self, keyId: str) -> bool:
-        keys = self._readJson(self.apiKeysPath)
-        found = False
-        for key in keys:
-            if key['keyId'] == keyId:
-                key['isActive'] = False
-                found = True
-        if found:
-            self._writeJson(self.apiKeysPath, keys)
-        return found
+        updated = self._execute(
+            "UPDATE api_keys SET isActive = 0 WHERE keyId = ?", (keyId,)
+        )
+        return updated > 0
 
     def getUserApiKeys(self, userId: str) -> List[ApiKey]:
-        keys = self._readJson(self.apiKeysPath)
-        userKeys = [ApiKey(**k) for k in keys if k['userId'] == userId]
-        return userKeys
+        rows = self._fetchAll(
+            "SELECT json_blob, isActive, usageCount FROM api_keys WHERE userId = ?",
+            (userId,)
+        )
+        return [self._rowToApiKey(row) for row in rows]
 
     def saveDeployment(self, deployment: Deployment) -> None:
-        deployments = self._readJson(self.deploymentsPath)
-        deployments = [d for d in deployments
-                      if d['deploymentId'] != deployment.deploymentId]
-        deployments.append(deployment.dict())
-        self._writeJson(self.deploymentsPath, deployments)
+        self._execute(
+            "INSERT OR REPLACE INTO " + _DEPLOYMENT_VALUES,
+            self._deploymentParams(deployment)
+        )
 
     def getDeployment(self, deploymentId: str) -> Optional[Deployment]:
-        deployments = self._readJson(self.deploymentsPath)
-        for deployment in deployments:
-            if deployment['deploymentId'] == deploymentId:
-                return Deployment(**deployment)
-        return None
+        row = self._fetchOne(
+            "SELECT json_blob FROM deployments WHERE deploymentId = ?",
+            (deploymentId,)
+        )
+        return Deployment.model_validate_json(row[0]) if row else None
 
     def getUserDeployments(self, userId: str) -> List[Deployment]:
-        deployments = self._readJson(self.deploymentsPath)
-        userDeployments = [Deployment(**d) for d in deployments
-                          if d['userId'] == userId]
-        return userDeployments
+        rows = self._fetchAll(
+            "SELECT json_blob FROM deployments WHERE userId = ?", (userId,)
+        )
+        return [Deployment.model_validate_json(row[0]) for row in rows]
 
     def saveUsageRecord(self, record: UsageRecord) -> None:
-        records = self._readJson(self.usagePath)
-        records.append(record.dict())
-        self._writeJson(self.usagePath, records)
+        self.saveUsageRecords([record])
+
+    def saveUsageRecords(self, records: List[UsageRecord]) -> None:
+        if not records:
+            return
+        self._executeTransaction([
+            ("INSERT INTO " + _USAGE_VALUES, [self._usageParams(r) for r in records]),
+            (_ROLLUP_UPSERT, [self._rollupParams(r) for r in records]),
+        ])
 
     def getUserUsage(self, userId: str, startDate: Optional[datetime] = None,
                     endDate: Optional[datetime] = None) -> List[UsageRecord]:
-        records = self._readJson(self.usagePath)
-        userRecords = [UsageRecord(**r) for r in records if r['userId'] == userId]
+        query = "SELECT json_blob FROM usage WHERE userId = ?"
+        params: List[Any] = [userId]
+
+        if startDate:
+            query += " AND timestamp >= ?"
+            params.append(startDate.timestamp())
+        if endDate:
+            query += " AND timestamp <= ?"
+            params.append(endDate.timestamp())
+
+        rows = self._fetchAll(query + " ORDER BY timestamp", tuple(params))
+        return [UsageRecord.model_validate_json(row[0]) for row in rows]
+
+    def getUserUsageRollup(self, userId: str,
+                           startDate: Optional[datetime] = None,
+                           endDate: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        query = ("SELECT modelName, SUM(requests), SUM(cost), SUM(processingTimeMs) "
+                 "FROM usage_rollup WHERE userId = ?")
+        params: List[Any] = [userId]
 
         if startDate:
-            userRecords = [r for r in userRecords if r.timestamp >= startDate]
+            query += " AND day >= ?"
+            params.append(startDate.date().isoformat())
         if endDate:
-            userRecords = [r for r in userRecords if r.timestamp <= endDate]
+            query += " AND day <= ?"
+            params.append(endDate.date().isoformat())
 
-        return userRecords
+        rows = self._fetchAll(query + " GROUP BY modelName", tuple(params))
+        return [
+            {
+                'modelName': modelName,
+                'requests': requests,
+                'cost': cost,
+                'processingTimeMs': processingTimeMs
+            }
+            for modelName, requests, cost, processingTimeMs in rows
+        ]
@@ -1,6 +1,10 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, Dict, Any
+import time
+
+def _fastNow() -> datetime:
+    return datetime.fromtimestamp(time.time())
 
 class User(BaseModel):
     userId: str
@@ -27,7 +31,7 @@ class UsageRecord(BaseModel):
     userId: str
     deploymentId: str
     modelName: str
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=_fastNow)
     requestCount: int = 1
     processingTimeMs: float
     cost: float = 0.0
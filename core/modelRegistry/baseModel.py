@@ -51,5 +51,5 @@ class BaseModel(ABC):
     def healthCheck(self) -> Dict[str, Any]:
         return {
             "status": "healthy" if self.isLoaded else "not_loaded",
-            "metadata": self.getMetadata().dict()
+            "metadata": self.getMetadata().model_dump()
         }
@@ -1,14 +1,21 @@
 from typing import Dict, List, Optional, Type
+from collections import OrderedDict
 from .baseModel import BaseModel, ModelMetadata
+import hashlib
 import importlib
 import inspect
 from pathlib import Path
 
 class ModelManager:
-    def __init__(self, pluginsPath: str = "plugins"):
+    def __init__(self, pluginsPath: str = "plugins", maxLoadedModels: int = 4,
+                 maxMemoryGb: Optional[float] = None):
         self.pluginsPath = Path(pluginsPath)
+        self.maxLoadedModels = maxLoadedModels
+        self.maxMemoryGb = maxMemoryGb
         self.registeredModels: Dict[str, Type[BaseModel]] = {}
-        self.loadedModels: Dict[str, BaseModel] = {}
+        self.loadedModels: "OrderedDict[str, BaseModel]" = OrderedDict()
+        self._metadataCache: Dict[str, ModelMetadata] = {}
+        self.modelsEtag = self._computeEtag()
 
     def discoverPlugins(self) -> List[str]:
         plugins = []
@@ -24,21 +31,40 @@ class ModelManager:
         if not issubclass(modelClass, BaseModel):
             raise ValueError(f"{modelClass} must inherit from BaseModel")
         self.registeredModels[modelName] = modelClass
+        self._metadataCache[modelName] = modelClass({}).getMetadata()
+        self.modelsEtag = self._computeEtag()
+
+    def _computeEtag(self) -> str:
+        digest = hashlib.md5()
+        for modelName in sorted(self._metadataCache):
+            metadata = self._metadataCache[modelName]
+            digest.update(metadata.model_dump_json(exclude={"createdAt"}).encode())
+        return f'"{digest.hexdigest()}"'
 
     def loadPlugin(self, pluginName: str) -> None:
         try:
             modulePath = f"{self.pluginsPath.name}.{pluginName}.model"
             module = importlib.import_module(modulePath)
 
-            for name, obj in inspect.getmembers(module):
-                if (inspect.isclass(obj) and
-                    issubclass(obj, BaseModel) and
-                    obj != BaseModel):
-                    self.registerModel(pluginName, obj)
-                    break
+            modelClass = getattr(module, "__model__", None)
+            if modelClass is None:
+                modelClass = self._findModelClass(module)
+            if modelClass is not None:
+                self.registerModel(pluginName, modelClass)
         except Exception as e:
             raise RuntimeError(f"Failed to load plugin {pluginName}: {str(e)}")
 
+    @staticmethod
+    def _findModelClass(module) -> Optional[Type[BaseModel]]:
+        for name, obj in module.__dict__.items():
+            if name.startswith("_"):
+                continue
+            if (inspect.isclass(obj) and
+                issubclass(obj, BaseModel) and
+                obj != BaseModel):
+                return obj
+        return None
+
     def loadAllPlugins(self) -> None:
         plugins = self.discoverPlugins()
         for plugin in plugins:
@@ -55,14 +81,35 @@ class ModelManager:
         model = modelClass(config)
         return model
 
+    def _modelMemoryGb(self, modelName: str) -> float:
+        metadata = self._metadataCache.get(modelName)
+        return metadata.minMemoryGb if metadata else 0
+
+    def _loadedMemoryGb(self) -> float:
+        return sum(self._modelMemoryGb(name) for name in self.loadedModels)
+
+    def _evictFor(self, modelName: str) -> None:
+        requiredGb = self._modelMemoryGb(modelName)
+        while self.loadedModels and (
+            len(self.loadedModels) >= self.maxLoadedModels or
+            (self.maxMemoryGb is not None and
+             self._loadedMemoryGb() + requiredGb > self.maxMemoryGb)
+        ):
+            _, evicted = self.loadedModels.popitem(last=False)
+            evicted.unload()
+
     def getModel(self, modelName: str, config: Optional[Dict] = None) -> BaseModel:
-        if modelName not in self.loadedModels:
-            if config is None:
-                config = {}
-            model = self.createModel(modelName, config)
-            model.load()
-            self.loadedModels[modelName] = model
-        return self.loadedModels[modelName]
+        if modelName in self.loadedModels:
+            self.loadedModels.move_to_end(modelName)
+            return self.loadedModels[modelName]
+
+        if config is None:
+            config = {}
+        model = self.createModel(modelName, config)
+        self._evictFor(modelName)
+        model.load()
+        self.loadedModels[modelName] = model
+        return model
 
     def unloadModel(self, modelName: str) -> None:
         if modelName in self.loadedModels:
@@ -70,8 +117,4 @@ class ModelManager:
             del self.loadedModels[modelName]
 
     def listModels(self) -> List[ModelMetadata]:
-        metadata = []
-        for modelName, modelClass in self.registeredModels.items():
-            tempModel = modelClass({})
-            metadata.append(tempModel.getMetadata())
-        return metadata
+        return list(self._metadataCache.values())
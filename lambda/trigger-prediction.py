@@ -1,18 +1,28 @@
 import boto3
+import httpx
 import json
 import os
-import requests
 from datetime import datetime
+from functools import lru_cache
 
 ssm_client = boto3.client("ssm")
+http_client = httpx.Client(
+    timeout=60,
+    limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=300),
+)
+
+
+@lru_cache(maxsize=1)
+def _ssmInferenceEndpoint():
+    response = ssm_client.get_parameter(
+        Name="/housing-crisis/inference-endpoint", WithDecryption=False
+    )
+    return response["Parameter"]["Value"]
 
 
 def getInferenceEndpoint():
     try:
-        response = ssm_client.get_parameter(
-            Name="/housing-crisis/inference-endpoint", WithDecryption=False
-        )
-        return response["Parameter"]["Value"]
+        return _ssmInferenceEndpoint()
     except:
         return os.environ.get(
             "INFERENCE_ENDPOINT",
@@ -31,9 +41,7 @@ def lambda_handler(event, context):
             "crisisDetection": event.get("crisisDetection", True),
         }
 
-        response = requests.post(
-            f"{endpoint}/predict", json=predictionRequest, timeout=60
-        )
+        response = http_client.post(f"{endpoint}/predict", json=predictionRequest)
 
         if response.status_code == 200:
             return {
@@ -1,106 +1,198 @@
-import boto3
+import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 
-eks_client = boto3.client("eks")
+eks_client = None
 k8s_client = None
 
 EKS_CLUSTER_NAME = os.environ.get("EKS_CLUSTER_NAME", "ml-cluster")
 AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
 IMAGE_TAG = os.environ.get("IMAGE_TAG", "latest")
+FIELD_MANAGER = "lambda-trigger"
+MAX_PARALLEL_SUBMITS = 10
+WARM_INIT_TYPES = ("provisioned-concurrency", "snap-start")
 
+JOB_MANIFEST_TEMPLATE = {
+    "apiVersion": "batch/v1",
+    "kind": "Job",
+    "metadata": {
+        "name": None,
+        "namespace": "ml-jobs",
+        "labels": {
+            "app": "housing-crisis",
+            "component": "training",
+            "triggered-by": "lambda",
+        },
+    },
+    "spec": {
+        "ttlSecondsAfterFinished": 86400,
+        "backoffLimit": 2,
+        "template": {
+            "spec": {
+                "restartPolicy": "OnFailure",
+                "nodeSelector": {
+                    "node.kubernetes.io/instance-type": "g5.2xlarge"
+                },
+                "containers": [
+                    {
+                        "name": "training",
+                        "image": None,
+                        "command": [
+                            "conda",
+                            "run",
+                            "--no-capture-output",
+                            "-n",
+                            "housing_ml_env",
+                            "/entrypoint.sh",
+                        ],
+                        "args": None,
+                        "env": [
+                            {"name": "CUDA_VISIBLE_DEVICES", "value": "0"},
+                            {"name": "PYTHONUNBUFFERED", "value": "1"},
+                        ],
+                        "resources": {
+                            "requests": {
+                                "cpu": "8",
+                                "memory": "32Gi",
+                                "nvidia.com/gpu": "1",
+                            },
+                            "limits": {
+                                "cpu": "16",
+                                "memory": "64Gi",
+                                "nvidia.com/gpu": "1",
+                            },
+                        },
+                    }
+                ],
+            }
+        },
+    },
+}
 
-def lambda_handler(event, context):
-    try:
-        jobId = f"lambda-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
 
-        fredApiKey = event.get("fredApiKey", os.environ.get("FRED_API_KEY", ""))
-        targetColumn = event.get("targetColumn", "CSUSHPISA")
-        useAutogluon = event.get("useAutogluon", False)
+def _get_eks():
+    global eks_client
+    if eks_client is None:
+        import boto3
 
-        accountId = context.invoked_function_arn.split(":")[4]
+        eks_client = boto3.client("eks")
+    return eks_client
 
-        jobManifest = {
-            "apiVersion": "batch/v1",
-            "kind": "Job",
-            "metadata": {
-                "name": f"housing-crisis-training-{jobId}",
-                "namespace": "ml-jobs",
-                "labels": {
-                    "app": "housing-crisis",
-                    "component": "training",
-                    "triggered-by": "lambda",
-                },
-            },
-            "spec": {
-                "ttlSecondsAfterFinished": 86400,
-                "backoffLimit": 2,
-                "template": {
-                    "spec": {
-                        "restartPolicy": "OnFailure",
-                        "nodeSelector": {
-                            "node.kubernetes.io/instance-type": "g5.2xlarge"
-                        },
-                        "containers": [
-                            {
-                                "name": "training",
-                                "image": f"{accountId}.dkr.ecr.{AWS_REGION}.amazonaws.com/housing-crisis-ml:{IMAGE_TAG}",
-                                "command": [
-                                    "conda",
-                                    "run",
-                                    "--no-capture-output",
-                                    "-n",
-                                    "housing_ml_env",
-                                    "/entrypoint.sh",
-                                ],
-                                "args": [
-                                    "train",
-                                    "--fred-api-key",
-                                    fredApiKey,
-                                    "--target",
-                                    targetColumn,
-                                ]
-                                + (["--use-autogluon"] if useAutogluon else []),
-                                "env": [
-                                    {"name": "CUDA_VISIBLE_DEVICES", "value": "0"},
-                                    {"name": "PYTHONUNBUFFERED", "value": "1"},
-                                ],
-                                "resources": {
-                                    "requests": {
-                                        "cpu": "8",
-                                        "memory": "32Gi",
-                                        "nvidia.com/gpu": "1",
-                                    },
-                                    "limits": {
-                                        "cpu": "16",
-                                        "memory": "64Gi",
-                                        "nvidia.com/gpu": "1",
-                                    },
-                                },
-                            }
-                        ],
-                    }
-                },
-            },
-        }
 
-        from kubernetes import client, config
+@lru_cache(maxsize=1)
+def _load_kubernetes():
+    from kubernetes import client, config
 
+    return client, config
+
+
+def _get_batch_api():
+    global k8s_client
+    if k8s_client is None:
+        from urllib3.util.retry import Retry
+
+        client, config = _load_kubernetes()
         config.load_incluster_config()
-        batch_v1 = client.BatchV1Api()
 
-        response = batch_v1.create_namespaced_job(namespace="ml-jobs", body=jobManifest)
+        configuration = client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = 10
+        configuration.retries = Retry(
+            total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)
+        )
+        k8s_client = client.BatchV1Api(client.ApiClient(configuration))
+    return k8s_client
+
+
+def _warm():
+    try:
+        _get_eks()
+        _get_batch_api()
+    except Exception as e:
+        print(f"Warning: Failed to pre-initialize clients: {e}")
+
+
+if os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") in WARM_INIT_TYPES:
+    _warm()
+
+
+def _buildJobManifest(jobName, image, args):
+    template = JOB_MANIFEST_TEMPLATE
+    podSpec = template["spec"]["template"]["spec"]
+    container = dict(podSpec["containers"][0], image=image, args=args)
+
+    return {
+        **template,
+        "metadata": {**template["metadata"], "name": jobName},
+        "spec": {
+            **template["spec"],
+            "template": {"spec": {**podSpec, "containers": [container]}},
+        },
+    }
+
+
+def _submitJob(batch_v1, jobSpec, accountId, timestamp):
+    fredApiKey = jobSpec.get("fredApiKey", os.environ.get("FRED_API_KEY", ""))
+    targetColumn = jobSpec.get("targetColumn", "CSUSHPISA")
+    useAutogluon = jobSpec.get("useAutogluon", False)
+
+    args = ["train", "--fred-api-key", fredApiKey, "--target", targetColumn] + (
+        ["--use-autogluon"] if useAutogluon else []
+    )
+    manifestHash = hashlib.sha256(
+        json.dumps(args + [IMAGE_TAG]).encode()
+    ).hexdigest()[:8]
+
+    jobId = f"lambda-{timestamp}-{manifestHash}"
+    jobName = f"housing-crisis-training-{jobId}"
+    jobManifest = _buildJobManifest(
+        jobName,
+        f"{accountId}.dkr.ecr.{AWS_REGION}.amazonaws.com/housing-crisis-ml:{IMAGE_TAG}",
+        args,
+    )
+
+    batch_v1.patch_namespaced_job(
+        name=jobName,
+        namespace="ml-jobs",
+        body=jobManifest,
+        field_manager=FIELD_MANAGER,
+        force=True,
+        _content_type="application/apply-patch+yaml",
+    )
+
+    return {"jobId": jobId, "jobName": jobName, "status": "submitted"}
+
+
+def lambda_handler(event, context):
+    try:
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        accountId = context.invoked_function_arn.split(":")[4]
+        batch_v1 = _get_batch_api()
+
+        if "jobs" not in event:
+            result = _submitJob(batch_v1, event, accountId, timestamp)
+            result["timestamp"] = datetime.now().isoformat()
+            return {"statusCode": 200, "body": json.dumps(result)}
+
+        jobSpecs = event["jobs"]
+        results = [None] * len(jobSpecs)
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_SUBMITS) as executor:
+            futures = {
+                executor.submit(_submitJob, batch_v1, jobSpec, accountId, timestamp): index
+                for index, jobSpec in enumerate(jobSpecs)
+            }
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = {"status": "failed", "error": str(e)}
 
         return {
             "statusCode": 200,
             "body": json.dumps(
-                {
-                    "jobId": jobId,
-                    "jobName": f"housing-crisis-training-{jobId}",
-                    "status": "submitted",
-                    "timestamp": datetime.now().isoformat(),
-                }
+                {"jobs": results, "timestamp": datetime.now().isoformat()}
             ),
         }
 
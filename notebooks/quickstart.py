@@ -29,18 +29,23 @@ print("\nGenerating synthetic demo data for quick start...")
 dates = pd.date_range(start="2010-01-01", end="2024-12-31", freq="MS")
 n = len(dates)
 
-syntheticData = pd.DataFrame(
-    {
-        "GDP": np.cumsum(np.random.randn(n) * 100 + 50) + 15000,
-        "CPIAUCSL": np.cumsum(np.random.randn(n) * 0.5 + 0.2) + 220,
-        "UNRATE": np.clip(np.random.randn(n) * 1.5 + 5.5, 3, 10),
-        "FEDFUNDS": np.clip(np.random.randn(n) * 0.5 + 2.5, 0, 6),
-        "MORTGAGE30US": np.clip(np.random.randn(n) * 0.8 + 4.5, 2.5, 8),
-        "HOUST": np.abs(np.random.randn(n) * 200 + 1200),
-        "CSUSHPISA": np.cumsum(np.random.randn(n) * 2 + 0.5) + 150,
-    },
-    index=dates,
-)
+seriesNames = ["GDP", "CPIAUCSL", "UNRATE", "FEDFUNDS", "MORTGAGE30US", "HOUST", "CSUSHPISA"]
+scales = np.array([100, 0.5, 1.5, 0.5, 0.8, 200, 2])
+offsets = np.array([50, 0.2, 5.5, 2.5, 4.5, 1200, 0.5])
+
+rng = np.random.default_rng(42)
+values = rng.standard_normal((n, len(seriesNames)), dtype=np.float32)
+values *= scales
+values += offsets
+
+cumulative = [0, 1, 6]
+values[:, cumulative] = np.cumsum(values[:, cumulative], axis=0) + np.array([15000, 220, 150])
+np.clip(values[:, 2], 3, 10, out=values[:, 2])
+np.clip(values[:, 3], 0, 6, out=values[:, 3])
+np.clip(values[:, 4], 2.5, 8, out=values[:, 4])
+np.abs(values[:, 5], out=values[:, 5])
+
+syntheticData = pd.DataFrame(values, index=dates, columns=seriesNames, copy=False)
 
 print(f"Synthetic data shape: {syntheticData.shape}")
 print(f"Date range: {syntheticData.index[0]} to {syntheticData.index[-1]}")
@@ -11,9 +11,49 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 import xgboost as xgb
-from catboost import CatBoostRegressor
+from catboost import CatBoostRegressor, FeaturesData
 import torch
-from sklearn.metrics import mean_squared_error
+from numba import njit
+from joblib import Parallel, delayed
+
+BLEND_WEIGHTS = np.arange(0, 1.1, 0.1)
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _blendWeightRmse(xgbPred, catPred, y, weights):
+    n = y.shape[0]
+    residualSq = 0.0
+    cross = 0.0
+    spreadSq = 0.0
+    for i in range(n):
+        residual = catPred[i] - y[i]
+        spread = xgbPred[i] - catPred[i]
+        residualSq += residual * residual
+        cross += residual * spread
+        spreadSq += spread * spread
+
+    rmse = np.empty(weights.shape[0])
+    for j in range(weights.shape[0]):
+        w = weights[j]
+        mse = (residualSq + 2.0 * w * cross + w * w * spreadSq) / n
+        rmse[j] = np.sqrt(max(mse, 0.0))
+    return rmse
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _crisisStatistics(predictions):
+    n = predictions.shape[0]
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        delta = predictions[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (predictions[i] - mean)
+
+    trend = (predictions[n - 1] - predictions[n - 12]) / 11 if n >= 12 else 0.0
+    volatility = np.sqrt(m2 / n) if n > 1 else 0.0
+    return trend, volatility
+
 
 class HousingCrisisModel(BaseModel):
     def __init__(self, config: Dict[str, Any]):
@@ -21,7 +61,9 @@ class HousingCrisisModel(BaseModel):
         self.xgbModel = None
         self.catboostModel = None
         self.blendWeights = {"xgboost": 0.5, "catboost": 0.5}
+        self.featureNames = None
         self.useGpu = torch.cuda.is_available()
+        self.taskType = "GPU" if self.useGpu else "CPU"
 
     def getMetadata(self) -> ModelMetadata:
         return ModelMetadata(
@@ -34,6 +76,7 @@ class HousingCrisisModel(BaseModel):
                 "xgboost>=2.0.0",
                 "catboost>=1.2.0",
                 "torch>=2.0.0",
+                "numba>=0.58.0",
                 "pandas>=2.0.0",
                 "numpy>=1.24.0"
             ],
@@ -46,8 +89,8 @@ class HousingCrisisModel(BaseModel):
         xgbConfig = self.config.get('xgboost', {})
         catboostConfig = self.config.get('catboost', {})
 
-        treeMethod = "gpu_hist" if self.useGpu else "hist"
-        taskType = "GPU" if self.useGpu else "CPU"
+        device = "cuda" if self.useGpu else "cpu"
+        self.taskType = "GPU" if self.useGpu else "CPU"
 
         xgbParams = {
             "n_estimators": xgbConfig.get('nEstimators', 1000),
@@ -57,7 +100,8 @@ class HousingCrisisModel(BaseModel):
             "colsample_bytree": xgbConfig.get('colsampleBytree', 0.8),
             "random_state": 42,
             "objective": "reg:squarederror",
-            "tree_method": treeMethod,
+            "tree_method": "hist",
+            "device": device,
         }
 
         catboostParams = {
@@ -65,8 +109,9 @@ class HousingCrisisModel(BaseModel):
             "learning_rate": catboostConfig.get('learningRate', 0.05),
             "depth": catboostConfig.get('depth', 7),
             "l2_leaf_reg": catboostConfig.get('l2LeafReg', 3.0),
+            "border_count": catboostConfig.get('borderCount', 128),
             "random_state": 42,
-            "task_type": taskType,
+            "task_type": self.taskType,
             "loss_function": "RMSE",
             "verbose": False,
         }
@@ -82,9 +127,22 @@ class HousingCrisisModel(BaseModel):
         startTime = time.time()
 
         df = pd.DataFrame(input.data) if isinstance(input.data, list) else input.data
+        if isinstance(df, pd.DataFrame):
+            df = self._alignFeatures(df)
+
+        features = np.ascontiguousarray(
+            df.to_numpy(dtype=np.float32) if isinstance(df, pd.DataFrame) else df,
+            dtype=np.float32
+        )
 
-        xgbPred = self.xgbModel.predict(df)
-        catPred = self.catboostModel.predict(df)
+        bestIteration = getattr(self.xgbModel, 'best_iteration', None)
+        xgbPred = self.xgbModel.get_booster().inplace_predict(
+            features,
+            iteration_range=(0, bestIteration + 1) if bestIteration is not None else (0, 0)
+        )
+        catPred = self.catboostModel.predict(
+            FeaturesData(num_feature_data=features), task_type=self.taskType
+        )
 
         blended = (
             self.blendWeights["xgboost"] * xgbPred +
@@ -112,6 +170,16 @@ class HousingCrisisModel(BaseModel):
             processingTimeMs=processingTime
         )
 
+    def _alignFeatures(self, df: pd.DataFrame) -> pd.DataFrame:
+        featureNames = self.featureNames or self.xgbModel.get_booster().feature_names
+        if not featureNames:
+            return df
+
+        missing = [name for name in featureNames if name not in df.columns]
+        if missing:
+            raise ValueError(f"Missing input features: {missing}")
+        return df[featureNames]
+
     def train(self, trainingData: Any, config: Dict[str, Any]) -> Dict[str, Any]:
         if not self.isLoaded:
             self.load()
@@ -120,6 +188,7 @@ class HousingCrisisModel(BaseModel):
         y = trainingData['y']
         valX = trainingData.get('valX')
         valY = trainingData.get('valY')
+        self.featureNames = list(X.columns) if hasattr(X, "columns") else None
 
         device = torch.cuda.get_device_name(0) if self.useGpu else "CPU"
         results = {'device': device}
@@ -129,23 +198,26 @@ class HousingCrisisModel(BaseModel):
 
         if evalSetXgb:
             self.xgbModel.set_params(
-                early_stopping_rounds=50,
-                callbacks=[xgb.callback.EarlyStopping(rounds=50)]
+                callbacks=[
+                    xgb.callback.EarlyStopping(rounds=50, save_best=True, maximize=False)
+                ]
             )
 
-        self.xgbModel.fit(X, y, eval_set=evalSetXgb, verbose=False)
-        results['xgboost'] = {
-            'bestIteration': getattr(self.xgbModel, 'best_iteration',
-                                    self.xgbModel.n_estimators)
-        }
-
         fitParams = {'X': X, 'y': y}
         if evalSetCat:
             fitParams['eval_set'] = evalSetCat
             fitParams['early_stopping_rounds'] = 50
             fitParams['use_best_model'] = True
 
-        self.catboostModel.fit(**fitParams)
+        self.xgbModel, self.catboostModel = Parallel(n_jobs=2, backend="threading")([
+            delayed(self.xgbModel.fit)(X, y, eval_set=evalSetXgb, verbose=False),
+            delayed(self.catboostModel.fit)(**fitParams),
+        ])
+
+        results['xgboost'] = {
+            'bestIteration': getattr(self.xgbModel, 'best_iteration',
+                                    self.xgbModel.n_estimators)
+        }
         results['catboost'] = {
             'bestIteration': getattr(self.catboostModel, 'best_iteration_',
                                     self.catboostModel.get_params()['iterations'])
@@ -161,23 +233,22 @@ class HousingCrisisModel(BaseModel):
         xgbPred = self.xgbModel.predict(X)
         catPred = self.catboostModel.predict(X)
 
-        bestRmse = float("inf")
-        bestWeight = 0.5
-
-        for weight in np.arange(0, 1.1, 0.1):
-            blendedPred = weight * xgbPred + (1 - weight) * catPred
-            rmse = np.sqrt(mean_squared_error(y, blendedPred))
+        rmse = _blendWeightRmse(
+            np.asarray(xgbPred, dtype=np.float64),
+            np.asarray(catPred, dtype=np.float64),
+            np.asarray(y, dtype=np.float64),
+            BLEND_WEIGHTS
+        )
 
-            if rmse < bestRmse:
-                bestRmse = rmse
-                bestWeight = weight
+        bestWeight = float(BLEND_WEIGHTS[np.argmin(rmse)])
 
         self.blendWeights = {"xgboost": bestWeight, "catboost": 1 - bestWeight}
 
     def _analyzeCrisis(self, predictions: np.ndarray,
                        features: pd.DataFrame) -> Dict[str, Any]:
-        recentTrend = np.mean(np.diff(predictions[-12:])) if len(predictions) >= 12 else 0
-        volatility = np.std(predictions) if len(predictions) > 1 else 0
+        recentTrend, volatility = _crisisStatistics(
+            np.ascontiguousarray(predictions, dtype=np.float64)
+        )
 
         if recentTrend < -5 and volatility > 10:
             crisisLevel = "HIGH"
@@ -212,3 +283,6 @@ class HousingCrisisModel(BaseModel):
                 'volatility': float(volatility)
             }
         }
+
+
+__model__ = HousingCrisisModel
@@ -13,17 +13,22 @@ setup(
         "torch>=2.0.0",
         "numpy>=1.24.0",
         "pandas>=2.0.0",
+        "pyarrow>=14.0.0",
+        "numba>=0.58.0",
         "scikit-learn>=1.3.0",
+        "joblib>=1.3.0",
         "xgboost>=2.0.0",
         "catboost>=1.2.0",
         "torch-geometric>=2.5.0",
         "transformers>=4.35.0",
         "fredapi>=0.5.0",
         "requests>=2.31.0",
+        "httpx>=0.25.0",
         "matplotlib>=3.7.0",
         "seaborn>=0.12.0",
         "plotly>=5.18.0",
         "pyyaml>=6.0",
+        "orjson>=3.9.0",
         "tqdm>=4.66.0",
         "scipy>=1.10.0",
     ],
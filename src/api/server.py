@@ -3,16 +3,26 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, Field, model_validator
+from typing import TYPE_CHECKING, List, Dict, Optional
 import numpy as np
 import pandas as pd
-import pickle
+import asyncio
+import joblib
+import orjson
 import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from pipeline.predictionPipeline import CrisisDetector
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -20,15 +30,44 @@ app = FastAPI(
     title="Housing Crisis Prediction API",
     description="Multi-modal ensemble inference API for housing crisis prediction",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 
+class NumpyORJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
 class PredictionRequest(BaseModel):
-    data: List[Dict]
+    data: Optional[List[Dict]] = None
+    columns: Optional[List[str]] = None
+    values: Optional[List[List[float]]] = None
     horizon: int = Field(default=12, ge=1, le=36)
     includeUncertainty: bool = False
     crisisDetection: bool = True
 
+    @model_validator(mode="after")
+    def checkPayload(self):
+        if self.values is None and self.data is None:
+            raise ValueError("Either data or columns/values must be provided")
+        if self.values is not None:
+            if self.columns is None:
+                raise ValueError("columns must be provided with values")
+            width = len(self.columns)
+            if any(len(row) != width for row in self.values):
+                raise ValueError(f"Every row in values must have {width} entries")
+        return self
+
+    def toFrame(self) -> pd.DataFrame:
+        if self.values is not None:
+            return pd.DataFrame(
+                np.asarray(self.values, dtype=np.float32),
+                columns=self.columns,
+                copy=False,
+            )
+        return pd.DataFrame.from_records(self.data)
+
 
 class HealthResponse(BaseModel):
     status: str
@@ -45,10 +84,38 @@ class PredictionResponse(BaseModel):
     uncertainty: Optional[Dict] = None
 
 
+def _loadXgboost(modelFile: Path):
+    import xgboost as xgb
+
+    from utils.featureBinning import BinnedBooster, loadBinEdges
+
+    booster = xgb.Booster()
+    booster.load_model(str(modelFile))
+    binEdges = loadBinEdges(booster)
+    return booster if binEdges is None else BinnedBooster(booster, binEdges)
+
+
+def _loadCatboost(modelFile: Path):
+    from catboost import CatBoostRegressor
+
+    model = CatBoostRegressor()
+    model.load_model(str(modelFile), format="cbm")
+    return model
+
+
+MODEL_LOADERS = {
+    ".pkl": lambda modelFile: joblib.load(modelFile, mmap_mode="r"),
+    ".joblib": lambda modelFile: joblib.load(modelFile, mmap_mode="r"),
+    ".ubj": _loadXgboost,
+    ".cbm": _loadCatboost,
+}
+
+
 class ModelRegistry:
-    def __init__(self):
+    def __init__(self, maxLoadWorkers: int = 8):
         self.models = {}
         self.loadedAt = None
+        self.maxLoadWorkers = maxLoadWorkers
 
     def loadModels(self, modelPath: str = "/app/models/saved"):
         try:
@@ -56,11 +123,20 @@ class ModelRegistry:
 
             modelPath = Path(modelPath)
             if modelPath.exists():
-                for modelFile in modelPath.glob("*.pkl"):
-                    modelName = modelFile.stem
-                    with open(modelFile, "rb") as f:
-                        self.models[modelName] = pickle.load(f)
-                    logger.info(f"Loaded model: {modelName}")
+                modelFiles = [
+                    modelFile
+                    for modelFile in modelPath.iterdir()
+                    if modelFile.suffix in MODEL_LOADERS
+                ]
+
+                with ThreadPoolExecutor(max_workers=self.maxLoadWorkers) as executor:
+                    loaded = executor.map(
+                        lambda modelFile: MODEL_LOADERS[modelFile.suffix](modelFile),
+                        modelFiles,
+                    )
+                    for modelFile, model in zip(modelFiles, loaded):
+                        self.models[modelFile.stem] = model
+                        logger.info(f"Loaded model: {modelFile.stem}")
 
             self.loadedAt = datetime.now()
             logger.info(f"Models loaded successfully at {self.loadedAt}")
@@ -75,6 +151,26 @@ class ModelRegistry:
 
 
 modelRegistry = ModelRegistry()
+app.state.crisis_detector = None
+app.state.batch_queue = None
+batchJobs: Dict[str, Dict] = {}
+batchJobExpiries: "OrderedDict[str, float]" = OrderedDict()
+batchCollectors = set()
+
+BATCH_JOBS_MAX = 1024
+BATCH_JOB_TTL_SECONDS = 600
+
+BATCH_MAX_SIZE = 64
+BATCH_WINDOW_SECONDS = 0.005
+BATCH_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+
+def getCrisisDetector() -> "CrisisDetector":
+    if app.state.crisis_detector is None:
+        from pipeline.predictionPipeline import CrisisDetector
+
+        app.state.crisis_detector = CrisisDetector()
+    return app.state.crisis_detector
 
 
 @app.on_event("startup")
@@ -84,6 +180,16 @@ async def startup():
     if not modelRegistry.isReady():
         logger.warning("No models loaded - running in demo mode")
 
+    try:
+        getCrisisDetector()
+    except Exception as e:
+        logger.warning(f"Crisis detector unavailable at startup: {e}")
+
+    app.state.batch_queue = asyncio.Queue()
+    app.state.batch_workers = [
+        asyncio.create_task(batchWorker()) for _ in range(BATCH_WORKERS)
+    ]
+
 
 @app.get("/health", response_model=HealthResponse)
 async def health():
@@ -105,47 +211,154 @@ async def listModels():
     }
 
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict(request: PredictionRequest):
-    try:
-        if not modelRegistry.isReady():
-            df = pd.DataFrame(request.data)
-            predictions = np.random.randn(request.horizon).tolist()
-
-            return PredictionResponse(
-                predictions=predictions,
-                horizon=request.horizon,
-                crisisLevel="DEMO",
-                crisisScore=0.5,
-                recommendations=["Demo mode - load models for real predictions"],
-            )
+def demoResponse(request: PredictionRequest) -> Dict:
+    return {
+        "predictions": np.random.randn(request.horizon),
+        "horizon": request.horizon,
+        "crisisLevel": "DEMO",
+        "crisisScore": 0.5,
+        "recommendations": ["Demo mode - load models for real predictions"],
+    }
 
-        df = pd.DataFrame(request.data)
 
-        ensemble = modelRegistry.models.get("ensemble")
-        if ensemble:
-            predictions = ensemble.predict(df).tolist()
-        else:
-            predictions = np.zeros(request.horizon).tolist()
+def buildResponse(
+    request: PredictionRequest, df: pd.DataFrame, predictions: np.ndarray
+) -> Dict:
+    response = {"predictions": predictions, "horizon": request.horizon}
+
+    if request.crisisDetection:
+        detector = getCrisisDetector()
 
-        response = PredictionResponse(predictions=predictions, horizon=request.horizon)
+        historicalData = df.iloc[-12:].values.flatten()
 
-        if request.crisisDetection:
-            from pipeline.predictionPipeline import CrisisDetector
+        crisisAnalysis = detector.detectCrisisLevel(predictions, historicalData)
+        recommendations = detector.generateRecommendations(crisisAnalysis)
 
-            detector = CrisisDetector()
+        response["crisisLevel"] = crisisAnalysis["crisisLevel"]
+        response["crisisScore"] = float(crisisAnalysis["crisisScore"])
+        response["recommendations"] = recommendations
 
-            historicalData = df.iloc[-12:].values.flatten()
-            predictionArray = np.array(predictions)
+    return response
 
-            crisisAnalysis = detector.detectCrisisLevel(predictionArray, historicalData)
-            recommendations = detector.generateRecommendations(crisisAnalysis)
 
-            response.crisisLevel = crisisAnalysis["crisisLevel"]
-            response.crisisScore = crisisAnalysis["crisisScore"]
-            response.recommendations = recommendations
+def predictFrames(ensemble, frames: List[pd.DataFrame]) -> List[np.ndarray]:
+    stacked = np.ascontiguousarray(
+        ensemble.predict(pd.concat(frames, ignore_index=True, copy=False))
+    )
+    offsets = np.cumsum([len(df) for df in frames])[:-1]
+    return np.split(stacked, offsets)
+
+
+def predictBatch(requests: List[PredictionRequest]) -> List:
+    if not modelRegistry.isReady():
+        return [demoResponse(request) for request in requests]
 
-        return response
+    ensemble = modelRegistry.models.get("ensemble")
+    results = [None] * len(requests)
+    groups = {}
+    for index, request in enumerate(requests):
+        try:
+            df = request.toFrame()
+        except Exception as e:
+            results[index] = e
+            continue
+        groups.setdefault(tuple(df.columns), []).append((index, request, df))
+
+    for members in groups.values():
+        predictions = None
+        if ensemble and len(members) > 1:
+            try:
+                predictions = predictFrames(ensemble, [df for _, _, df in members])
+            except Exception as e:
+                logger.warning(f"Batched prediction failed, retrying per request: {e}")
+
+        for position, (index, request, df) in enumerate(members):
+            try:
+                if predictions is not None:
+                    prediction = predictions[position]
+                elif ensemble:
+                    prediction = np.ascontiguousarray(ensemble.predict(df))
+                else:
+                    prediction = np.zeros(request.horizon)
+                results[index] = buildResponse(request, df, prediction)
+            except Exception as e:
+                results[index] = e
+
+    return results
+
+
+async def batchWorker():
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await app.state.batch_queue.get()]
+        deadline = loop.time() + BATCH_WINDOW_SECONDS
+
+        while len(batch) < BATCH_MAX_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(app.state.batch_queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+
+        try:
+            responses = await asyncio.to_thread(
+                predictBatch, [request for request, _ in batch]
+            )
+            for (_, future), response in zip(batch, responses):
+                if isinstance(response, Exception):
+                    future.set_exception(response)
+                else:
+                    future.set_result(response)
+        except Exception as e:
+            logger.error(f"Batch prediction error: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+def sweepBatchJobs():
+    now = time.monotonic()
+    while batchJobExpiries:
+        jobId, expiresAt = next(iter(batchJobExpiries.items()))
+        if expiresAt > now and len(batchJobs) <= BATCH_JOBS_MAX:
+            break
+        del batchJobExpiries[jobId]
+        batchJobs.pop(jobId, None)
+
+
+async def collectBatchJob(jobId: str, futures: List[asyncio.Future]):
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    batchJobs[jobId] = {
+        "status": "completed",
+        "count": len(results),
+        "results": [
+            {"error": str(result)} if isinstance(result, Exception) else result
+            for result in results
+        ],
+        "completedAt": datetime.now().isoformat(),
+    }
+    batchJobExpiries[jobId] = time.monotonic() + BATCH_JOB_TTL_SECONDS
+
+
+@app.post("/predict", responses={200: {"model": PredictionResponse}})
+async def predict(request: PredictionRequest):
+    try:
+        if not modelRegistry.isReady():
+            return NumpyORJSONResponse(demoResponse(request))
+
+        df = request.toFrame()
+
+        ensemble = modelRegistry.models.get("ensemble")
+        if ensemble:
+            predictions = np.ascontiguousarray(ensemble.predict(df))
+        else:
+            predictions = np.zeros(request.horizon)
+
+        return NumpyORJSONResponse(buildResponse(request, df, predictions))
 
     except Exception as e:
         logger.error(f"Prediction error: {e}")
@@ -153,17 +366,39 @@ async def predict(request: PredictionRequest):
 
 
 @app.post("/batch-predict")
-async def batchPredict(
-    requests: List[PredictionRequest], backgroundTasks: BackgroundTasks
-):
+async def batchPredict(requests: List[PredictionRequest]):
+    loop = asyncio.get_running_loop()
+    jobId = f"batch-{uuid.uuid4().hex}"
+
+    futures = []
+    for request in requests:
+        future = loop.create_future()
+        app.state.batch_queue.put_nowait((request, future))
+        futures.append(future)
+
+    sweepBatchJobs()
+    batchJobs[jobId] = {"status": "processing", "count": len(requests)}
+    collector = asyncio.create_task(collectBatchJob(jobId, futures))
+    batchCollectors.add(collector)
+    collector.add_done_callback(batchCollectors.discard)
+
     return {
         "status": "accepted",
-        "jobId": f"batch-{datetime.now().timestamp()}",
+        "jobId": jobId,
         "count": len(requests),
         "message": "Batch job queued for processing",
     }
 
 
+@app.get("/batch-predict/{jobId}")
+async def batchPredictStatus(jobId: str):
+    sweepBatchJobs()
+    job = batchJobs.get(jobId)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return NumpyORJSONResponse(job)
+
+
 @app.post("/reload-models")
 async def reloadModels():
     success = modelRegistry.loadModels()
@@ -4,13 +4,23 @@ from fredapi import Fred
 import requests
 from pathlib import Path
 from typing import List, Dict, Optional
-import pickle
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 
 class DataCollector:
-    def __init__(self, fredApiKey: Optional[str] = None, cachePath: str = "data/cache"):
+    def __init__(
+        self,
+        fredApiKey: Optional[str] = None,
+        cachePath: str = "data/cache",
+        maxWorkers: int = 8,
+        rowGroupSize: int = 4096,
+    ):
         self.fredApiKey = fredApiKey
+        self.maxWorkers = maxWorkers
+        self.rowGroupSize = rowGroupSize
         self.cachePath = Path(cachePath)
         self.cachePath.mkdir(parents=True, exist_ok=True)
 
@@ -23,36 +33,62 @@ class DataCollector:
         cacheFile = (
             self.cachePath
             / "fred"
-            / f"fred_data_{datetime.now().strftime('%Y%m%d')}.pkl"
+            / f"fred_data_{datetime.now().strftime('%Y%m%d')}.parquet"
         )
         cacheFile.parent.mkdir(parents=True, exist_ok=True)
 
+        cachedDf = None
         if cacheFile.exists():
-            with open(cacheFile, "rb") as f:
-                return pickle.load(f)
+            cachedColumns = set(pq.read_schema(cacheFile).names)
+            if cachedColumns.issuperset(seriesIds):
+                return pd.read_parquet(cacheFile, engine="pyarrow", columns=seriesIds)
+            cachedDf = pd.read_parquet(cacheFile, engine="pyarrow")
+
+        missingIds = [
+            seriesId
+            for seriesId in seriesIds
+            if cachedDf is None or seriesId not in cachedDf.columns
+        ]
 
         dataFrames = {}
-        for seriesId in seriesIds:
-            try:
-                data = self.fredClient.get_series(seriesId, observation_start=startDate)
-                dataFrames[seriesId] = data
-            except Exception as e:
-                print(f"Error fetching {seriesId}: {e}")
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            futures = {
+                executor.submit(
+                    self.fredClient.get_series, seriesId, observation_start=startDate
+                ): seriesId
+                for seriesId in missingIds
+            }
+            for future in as_completed(futures):
+                seriesId = futures[future]
+                try:
+                    dataFrames[seriesId] = future.result()
+                except Exception as e:
+                    print(f"Error fetching {seriesId}: {e}")
+
+        if cachedDf is not None:
+            dataFrames = {**cachedDf.to_dict("series"), **dataFrames}
 
         combinedDf = pd.DataFrame(dataFrames)
 
-        with open(cacheFile, "wb") as f:
-            pickle.dump(combinedDf, f)
+        self._writeParquet(combinedDf, cacheFile)
+
+        return combinedDf[[seriesId for seriesId in seriesIds if seriesId in combinedDf]]
 
-        return combinedDf
+    def _writeParquet(self, df: pd.DataFrame, path: Path) -> None:
+        schema = pa.Schema.from_pandas(df, preserve_index=True)
+        with pq.ParquetWriter(path, schema, compression="snappy") as writer:
+            for start in range(0, max(len(df), 1), self.rowGroupSize):
+                chunk = df.iloc[start : start + self.rowGroupSize]
+                writer.write_table(
+                    pa.Table.from_pandas(chunk, schema=schema, preserve_index=True)
+                )
 
     def collectZillowData(self, region: str = "national") -> pd.DataFrame:
-        cacheFile = self.cachePath / "zillow" / f"zillow_{region}.pkl"
+        cacheFile = self.cachePath / "zillow" / f"zillow_{region}.parquet"
         cacheFile.parent.mkdir(parents=True, exist_ok=True)
 
         if cacheFile.exists():
-            with open(cacheFile, "rb") as f:
-                return pickle.load(f)
+            return pd.read_parquet(cacheFile, engine="pyarrow")
 
         zillowFredSeries = [
             "ZHVI",
@@ -63,8 +99,7 @@ class DataCollector:
         if self.fredApiKey:
             zillowData = self.collectFredData(zillowFredSeries)
 
-            with open(cacheFile, "wb") as f:
-                pickle.dump(zillowData, f)
+            self._writeParquet(zillowData, cacheFile)
 
             return zillowData
 
@@ -1,107 +1,277 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
+from numba import njit, prange
+from sklearn.preprocessing import MinMaxScaler
 from typing import Tuple, Optional
 
 
+@njit(parallel=True, nogil=True, cache=True)
+def _rollingMeanStdMinMax(values, window):
+    n, nCols = values.shape
+    outMean = np.full((n, nCols), np.nan)
+    outStd = np.full((n, nCols), np.nan)
+    outMin = np.full((n, nCols), np.nan)
+    outMax = np.full((n, nCols), np.nan)
+
+    for j in prange(nCols):
+        minDeque = np.empty(n, dtype=np.int64)
+        maxDeque = np.empty(n, dtype=np.int64)
+        minHead = minTail = maxHead = maxTail = 0
+        count = 0
+        nanCount = 0
+        mean = 0.0
+        m2 = 0.0
+
+        for i in range(n):
+            x = values[i, j]
+            if np.isnan(x):
+                nanCount += 1
+            else:
+                count += 1
+                delta = x - mean
+                mean += delta / count
+                m2 += delta * (x - mean)
+
+                while minTail > minHead and values[minDeque[minTail - 1], j] >= x:
+                    minTail -= 1
+                minDeque[minTail] = i
+                minTail += 1
+                while maxTail > maxHead and values[maxDeque[maxTail - 1], j] <= x:
+                    maxTail -= 1
+                maxDeque[maxTail] = i
+                maxTail += 1
+
+            if i >= window:
+                y = values[i - window, j]
+                if np.isnan(y):
+                    nanCount -= 1
+                else:
+                    count -= 1
+                    if count == 0:
+                        mean = 0.0
+                        m2 = 0.0
+                    else:
+                        delta = y - mean
+                        mean -= delta / count
+                        m2 -= delta * (y - mean)
+
+                if minTail > minHead and minDeque[minHead] <= i - window:
+                    minHead += 1
+                if maxTail > maxHead and maxDeque[maxHead] <= i - window:
+                    maxHead += 1
+
+            if i >= window - 1 and nanCount == 0:
+                outMean[i, j] = mean
+                if window > 1:
+                    outStd[i, j] = np.sqrt(max(m2, 0.0) / (window - 1))
+                outMin[i, j] = values[minDeque[minHead], j]
+                outMax[i, j] = values[maxDeque[maxHead], j]
+
+    return outMean, outStd, outMin, outMax
+
+
 class FeatureEngineer:
     def __init__(self):
-        self.scaler = StandardScaler()
+        self.featureMean = None
+        self.featureStd = None
         self.minMaxScaler = MinMaxScaler()
         self.featureNames = []
+        self._featureColumns = None
+        self._featureTarget = None
+        self._indexer = None
 
-    def createTemporalFeatures(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
+    @staticmethod
+    def _floatDtype(series: pd.Series) -> np.dtype:
+        if np.issubdtype(series.dtype, np.floating):
+            return series.dtype
+        return np.dtype(np.float64)
 
-        if isinstance(df.index, pd.DatetimeIndex):
-            df["month"] = df.index.month
-            df["quarter"] = df.index.quarter
-            df["year"] = df.index.year
-            df["dayOfYear"] = df.index.dayofyear
-            df["weekOfYear"] = df.index.isocalendar().week
+    @staticmethod
+    def _withColumns(df: pd.DataFrame, newColumns: dict) -> pd.DataFrame:
+        if not newColumns:
+            return df.copy()
+        return pd.concat(
+            [df, pd.DataFrame(newColumns, index=df.index)], axis=1, copy=False
+        )
 
-        return df
+    def _temporalColumns(self, df: pd.DataFrame) -> dict:
+        if not isinstance(df.index, pd.DatetimeIndex):
+            return {}
 
-    def createLagFeatures(
-        self, df: pd.DataFrame, columns: list, lags: list = [1, 3, 6, 12]
-    ) -> pd.DataFrame:
-        df = df.copy()
+        index = df.index
+        return {
+            "month": index.month.to_numpy(np.int8),
+            "quarter": index.quarter.to_numpy(np.int8),
+            "year": index.year.to_numpy(np.int16),
+            "dayOfYear": index.dayofyear.to_numpy(np.int16),
+            "weekOfYear": index.isocalendar().week.to_numpy(np.int8),
+        }
 
-        for col in columns:
-            if col in df.columns:
-                for lag in lags:
-                    df[f"{col}_lag_{lag}"] = df[col].shift(lag)
+    def _lagColumns(self, df: pd.DataFrame, columns: list, lags: list) -> dict:
+        columns = [col for col in columns if col in df.columns]
+        if not columns:
+            return {}
 
-        return df
+        dtypes = {self._floatDtype(df[col]) for col in columns}
+        dtype = dtypes.pop() if len(dtypes) == 1 else np.dtype(np.float64)
+        values = df[columns].to_numpy(dtype=dtype)
+        n = len(values)
 
-    def createRollingFeatures(
-        self, df: pd.DataFrame, columns: list, windows: list = [3, 6, 12]
-    ) -> pd.DataFrame:
-        df = df.copy()
+        shiftedBlocks = {}
+        for lag in lags:
+            shifted = np.full_like(values, np.nan)
+            if lag < n:
+                shifted[lag:] = values[: n - lag]
+            shiftedBlocks[lag] = shifted
 
-        for col in columns:
-            if col in df.columns:
-                for window in windows:
-                    df[f"{col}_rolling_mean_{window}"] = (
-                        df[col].rolling(window=window).mean()
-                    )
-                    df[f"{col}_rolling_std_{window}"] = (
-                        df[col].rolling(window=window).std()
-                    )
-                    df[f"{col}_rolling_min_{window}"] = (
-                        df[col].rolling(window=window).min()
-                    )
-                    df[f"{col}_rolling_max_{window}"] = (
-                        df[col].rolling(window=window).max()
+        return {
+            f"{col}_lag_{lag}": shiftedBlocks[lag][:, j]
+            for j, col in enumerate(columns)
+            for lag in lags
+        }
+
+    def _rollingColumns(self, df: pd.DataFrame, columns: list, windows: list) -> dict:
+        columns = [col for col in columns if col in df.columns]
+        if not columns:
+            return {}
+
+        values = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float64))
+        dtypes = [self._floatDtype(df[col]) for col in columns]
+        rolled = {}
+
+        for window in windows:
+            stats = dict(
+                zip(("mean", "std", "min", "max"), _rollingMeanStdMinMax(values, window))
+            )
+            for j, col in enumerate(columns):
+                for statName, result in stats.items():
+                    rolled[f"{col}_rolling_{statName}_{window}"] = result[:, j].astype(
+                        dtypes[j], copy=False
                     )
 
-        return df
+        rollingNames = [
+            f"{col}_rolling_{statName}_{window}"
+            for col in columns
+            for window in windows
+            for statName in ("mean", "std", "min", "max")
+        ]
 
-    def createDifferenceFeatures(self, df: pd.DataFrame, columns: list) -> pd.DataFrame:
-        df = df.copy()
+        return {name: rolled[name] for name in rollingNames}
+
+    def _differenceColumns(self, df: pd.DataFrame, columns: list) -> dict:
+        differences = {}
 
         for col in columns:
             if col in df.columns:
-                df[f"{col}_diff_1"] = df[col].diff(1)
-                df[f"{col}_diff_12"] = df[col].diff(12)
-                df[f"{col}_pct_change_1"] = df[col].pct_change(1)
-                df[f"{col}_pct_change_12"] = df[col].pct_change(12)
+                values = df[col].to_numpy(dtype=self._floatDtype(df[col]))
+                shiftedByLag = {}
+                for lag in (1, 12):
+                    shifted = np.empty_like(values)
+                    shifted[:lag] = np.nan
+                    shifted[lag:] = values[:-lag]
+                    shiftedByLag[lag] = shifted
 
-        return df
+                diffs = {lag: values - shifted for lag, shifted in shiftedByLag.items()}
+                for lag, diff in diffs.items():
+                    differences[f"{col}_diff_{lag}"] = diff
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    for lag, diff in diffs.items():
+                        differences[f"{col}_pct_change_{lag}"] = diff / shiftedByLag[lag]
 
-    def createInteractionFeatures(self, df: pd.DataFrame, pairs: list) -> pd.DataFrame:
-        df = df.copy()
+        return differences
+
+    def _interactionColumns(self, df: pd.DataFrame, pairs: list) -> dict:
+        interactions = {}
 
         for col1, col2 in pairs:
             if col1 in df.columns and col2 in df.columns:
-                df[f"{col1}_x_{col2}"] = df[col1] * df[col2]
-                df[f"{col1}_div_{col2}"] = df[col1] / (df[col2] + 1e-8)
+                a = df[col1].to_numpy()
+                b = df[col2].to_numpy()
+                interactions[f"{col1}_x_{col2}"] = a * b
+                ratio = np.add(b, 1e-8)
+                interactions[f"{col1}_div_{col2}"] = np.divide(a, ratio, out=ratio)
+
+        return interactions
+
+    def createTemporalFeatures(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._withColumns(df, self._temporalColumns(df))
+
+    def createLagFeatures(
+        self, df: pd.DataFrame, columns: list, lags: list = [1, 3, 6, 12]
+    ) -> pd.DataFrame:
+        return self._withColumns(df, self._lagColumns(df, columns, lags))
 
-        return df
+    def createRollingFeatures(
+        self, df: pd.DataFrame, columns: list, windows: list = [3, 6, 12]
+    ) -> pd.DataFrame:
+        return self._withColumns(df, self._rollingColumns(df, columns, windows))
+
+    def createDifferenceFeatures(self, df: pd.DataFrame, columns: list) -> pd.DataFrame:
+        return self._withColumns(df, self._differenceColumns(df, columns))
+
+    def createInteractionFeatures(self, df: pd.DataFrame, pairs: list) -> pd.DataFrame:
+        return self._withColumns(df, self._interactionColumns(df, pairs))
 
     def engineerAllFeatures(
         self, df: pd.DataFrame, targetColumns: list
     ) -> pd.DataFrame:
-        df = self.createTemporalFeatures(df)
-        df = self.createLagFeatures(df, targetColumns)
-        df = self.createRollingFeatures(df, targetColumns)
-        df = self.createDifferenceFeatures(df, targetColumns)
-
         interactionPairs = [
             ("GDP", "UNRATE"),
             ("MORTGAGE30US", "HOUST"),
             ("FEDFUNDS", "CPIAUCSL"),
         ]
-        df = self.createInteractionFeatures(df, interactionPairs)
 
-        df = df.dropna()
+        temporal = self._temporalColumns(df)
+        sourceNames = [col for col in df.columns if col not in temporal]
+
+        columns = {col: df[col].to_numpy() for col in sourceNames}
+        columns.update(self._lagColumns(df, targetColumns, [1, 3, 6, 12]))
+        columns.update(self._rollingColumns(df, targetColumns, [3, 6, 12]))
+        columns.update(self._differenceColumns(df, targetColumns))
+        columns.update(self._interactionColumns(df, interactionPairs))
+
+        sourceDtypes = {self._floatDtype(df[col]) for col in sourceNames}
+        dtype = sourceDtypes.pop() if len(sourceDtypes) == 1 else np.dtype(np.float64)
+
+        buffer = np.empty((len(df), len(columns)), dtype=dtype, order="F")
+        for k, values in enumerate(columns.values()):
+            buffer[:, k] = values
 
-        return df
+        names = list(columns)
+        nSource = len(sourceNames)
+        engineered = pd.concat(
+            [
+                pd.DataFrame(buffer[:, :nSource], index=df.index, columns=names[:nSource], copy=False),
+                pd.DataFrame(temporal, index=df.index),
+                pd.DataFrame(buffer[:, nSource:], index=df.index, columns=names[nSource:], copy=False),
+            ],
+            axis=1,
+            copy=False,
+        )
+
+        return engineered.dropna()
+
+    def _featureIndexer(self, df: pd.DataFrame, targetCol: str) -> np.ndarray:
+        if self._featureColumns is not df.columns or self._featureTarget != targetCol:
+            self.featureNames = [col for col in df.columns if col != targetCol]
+            self._indexer = df.columns.get_indexer(self.featureNames)
+            self._featureColumns = df.columns
+            self._featureTarget = targetCol
+        return self._indexer
 
     def scaleFeatures(self, X: pd.DataFrame, fit: bool = True) -> np.ndarray:
+        values = np.asarray(X, dtype=np.float32)
         if fit:
-            return self.scaler.fit_transform(X)
-        return self.scaler.transform(X)
+            self.featureMean = values.mean(axis=0, dtype=np.float64).astype(np.float32)
+            featureStd = values.std(axis=0, dtype=np.float64)
+            featureStd[featureStd == 0] = 1.0
+            self.featureStd = featureStd.astype(np.float32)
+        elif self.featureMean is None:
+            raise ValueError("scaleFeatures must be fitted before transforming")
+
+        scaled = np.subtract(values, self.featureMean)
+        scaled /= self.featureStd
+        return scaled
 
     def splitTimeSeriesData(
         self,
@@ -114,15 +284,14 @@ class FeatureEngineer:
         trainEnd = int(n * trainRatio)
         valEnd = int(n * (trainRatio + valRatio))
 
-        featureCols = [col for col in df.columns if col != targetCol]
-
-        trainX = df[featureCols].iloc[:trainEnd]
-        trainY = df[targetCol].iloc[:trainEnd]
-
-        valX = df[featureCols].iloc[trainEnd:valEnd]
-        valY = df[targetCol].iloc[trainEnd:valEnd]
-
-        testX = df[featureCols].iloc[valEnd:]
-        testY = df[targetCol].iloc[valEnd:]
+        X = df.iloc[:, self._featureIndexer(df, targetCol)]
+        y = df[targetCol]
 
-        return trainX, trainY, valX, valY, testX, testY
+        return (
+            X.iloc[:trainEnd],
+            y.iloc[:trainEnd],
+            X.iloc[trainEnd:valEnd],
+            y.iloc[trainEnd:valEnd],
+            X.iloc[valEnd:],
+            y.iloc[valEnd:],
+        )
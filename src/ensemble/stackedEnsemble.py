@@ -3,15 +3,20 @@ import pandas as pd
 from sklearn.linear_model import Ridge, Lasso
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from joblib import Parallel, delayed
 from typing import List, Dict, Optional
-import pickle
+import joblib
 
 
 class StackedEnsemble:
     def __init__(
-        self, metaLearnerType: str = "ridge", metaLearnerParams: Optional[Dict] = None
+        self,
+        metaLearnerType: str = "ridge",
+        metaLearnerParams: Optional[Dict] = None,
+        nJobs: int = -1,
     ):
         self.metaLearnerType = metaLearnerType
+        self.nJobs = nJobs
         self.metaLearnerParams = metaLearnerParams or {}
         self.metaLearner = self._initMetaLearner()
         self.baseModels = {}
@@ -33,17 +38,22 @@ class StackedEnsemble:
     def generateBasePredictions(
         self, X: pd.DataFrame, stage: str = "train"
     ) -> np.ndarray:
-        predictions = []
-
         for name, model in self.baseModels.items():
-            if hasattr(model, "predict"):
-                pred = model.predict(X)
-                predictions.append(pred)
-                print(f"Generated predictions from {name}")
-            else:
+            if not hasattr(model, "predict"):
                 raise ValueError(f"Model {name} does not have a predict method")
 
-        stackedPredictions = np.column_stack(predictions)
+        stackedPredictions = np.empty(
+            (len(X), len(self.baseModels)), dtype=np.float32, order="F"
+        )
+
+        modelPredictions = Parallel(n_jobs=self.nJobs, prefer="threads")(
+            delayed(model.predict)(X) for model in self.baseModels.values()
+        )
+
+        for i, (name, pred) in enumerate(zip(self.baseModels, modelPredictions)):
+            stackedPredictions[:, i] = pred
+            print(f"Generated predictions from {name}")
+
         self.basePredictions[stage] = stackedPredictions
 
         return stackedPredictions
@@ -72,7 +82,8 @@ class StackedEnsemble:
         return self.metaLearner.predict(basePredictions)
 
     def evaluate(self, X: pd.DataFrame, y: pd.Series) -> Dict:
-        predictions = self.predict(X)
+        basePredictions = self.generateBasePredictions(X, stage="test")
+        predictions = self.metaLearner.predict(basePredictions)
 
         metrics = {
             "ensemble": {
@@ -82,14 +93,13 @@ class StackedEnsemble:
             }
         }
 
-        for name, model in self.baseModels.items():
-            if hasattr(model, "predict"):
-                basePred = model.predict(X)
-                metrics[name] = {
-                    "rmse": np.sqrt(mean_squared_error(y, basePred)),
-                    "mae": mean_absolute_error(y, basePred),
-                    "r2": r2_score(y, basePred),
-                }
+        for i, name in enumerate(self.baseModels):
+            basePred = basePredictions[:, i]
+            metrics[name] = {
+                "rmse": np.sqrt(mean_squared_error(y, basePred)),
+                "mae": mean_absolute_error(y, basePred),
+                "r2": r2_score(y, basePred),
+            }
 
         return metrics
 
@@ -106,12 +116,10 @@ class StackedEnsemble:
             "metaLearnerType": self.metaLearnerType,
             "baseModelNames": list(self.baseModels.keys()),
         }
-        with open(path, "wb") as f:
-            pickle.dump(ensembleData, f)
+        joblib.dump(ensembleData, path)
 
     def loadEnsemble(self, path: str):
-        with open(path, "rb") as f:
-            ensembleData = pickle.load(f)
+        ensembleData = joblib.load(path)
         self.metaLearner = ensembleData["metaLearner"]
         self.metaLearnerType = ensembleData["metaLearnerType"]
 
@@ -8,6 +8,10 @@ import json
 import logging
 from datetime import datetime
 import boto3
+import joblib
+import numpy as np
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 
 from pipeline.trainingPipeline import TrainingPipeline
@@ -18,6 +22,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+MODEL_SUFFIXES = (".joblib", ".pkl")
+
 
 class BatchJobRunner:
     def __init__(self, jobConfig: Dict):
@@ -86,16 +92,15 @@ class BatchJobRunner:
         savePath = Path(self.jobConfig.get("modelOutputPath", "/app/models/saved"))
         savePath.mkdir(parents=True, exist_ok=True)
 
-        import pickle
+        compression = self.jobConfig.get("modelCompression", 0)
 
         for modelName, model in models.items():
-            modelFile = savePath / f"{modelName}_{self.jobId}.pkl"
-            with open(modelFile, "wb") as f:
-                pickle.dump(model, f)
+            modelFile = savePath / f"{modelName}_{self.jobId}.joblib"
+            joblib.dump(model, modelFile, compress=compression)
             logger.info(f"Saved model: {modelFile}")
 
             if self.s3Client and self.jobConfig.get("s3Bucket"):
-                s3Key = f"models/{modelName}_{self.jobId}.pkl"
+                s3Key = f"models/{modelName}_{self.jobId}.joblib"
                 self.s3Client.upload_file(
                     str(modelFile), self.jobConfig["s3Bucket"], s3Key
                 )
@@ -104,8 +109,6 @@ class BatchJobRunner:
                 )
 
     def _loadModels(self) -> Dict:
-        import pickle
-
         models = {}
 
         if self.s3Client and self.jobConfig.get("s3Bucket"):
@@ -114,66 +117,71 @@ class BatchJobRunner:
                 Bucket=self.jobConfig["s3Bucket"], Prefix=s3Prefix
             )
 
-            for obj in response.get("Contents", []):
-                if obj["Key"].endswith(".pkl"):
-                    tmpFile = Path(f"/tmp/{Path(obj['Key']).name}")
-                    self.s3Client.download_file(
-                        self.jobConfig["s3Bucket"], obj["Key"], str(tmpFile)
-                    )
-
-                    with open(tmpFile, "rb") as f:
-                        modelName = tmpFile.stem.split("_")[0]
-                        models[modelName] = pickle.load(f)
-                    logger.info(f"Loaded model from S3: {obj['Key']}")
+            keys = [
+                obj["Key"]
+                for obj in response.get("Contents", [])
+                if obj["Key"].endswith(MODEL_SUFFIXES)
+            ]
+
+            maxWorkers = min(self.jobConfig.get("maxDownloadWorkers", 16), len(keys))
+            with ThreadPoolExecutor(max_workers=max(1, maxWorkers)) as executor:
+                for key, model in zip(keys, executor.map(self._fetchS3Model, keys)):
+                    models[Path(key).stem.split("_")[0]] = model
+                    logger.info(f"Loaded model from S3: {key}")
         else:
             modelPath = Path(self.jobConfig.get("modelInputPath", "/app/models/saved"))
-            for modelFile in modelPath.glob("*.pkl"):
-                with open(modelFile, "rb") as f:
-                    models[modelFile.stem] = pickle.load(f)
+            for modelFile in modelPath.iterdir():
+                if modelFile.suffix not in MODEL_SUFFIXES:
+                    continue
+                models[modelFile.stem] = joblib.load(modelFile)
                 logger.info(f"Loaded model: {modelFile}")
 
         return models
 
+    def _fetchS3Model(self, key: str):
+        tmpFile = Path(f"/tmp/{Path(key).name}")
+        self.s3Client.download_file(self.jobConfig["s3Bucket"], key, str(tmpFile))
+        return joblib.load(tmpFile)
+
     def _loadInputData(self) -> Dict:
-        import pandas as pd
+        import pyarrow.parquet as pq
 
         if self.s3Client and self.jobConfig.get("s3InputPath"):
             tmpFile = Path("/tmp/input_data.parquet")
             self.s3Client.download_file(
                 self.jobConfig["s3Bucket"], self.jobConfig["s3InputPath"], str(tmpFile)
             )
-            df = pd.read_parquet(tmpFile)
+            table = pq.read_table(tmpFile)
         else:
             inputPath = Path(
                 self.jobConfig.get("inputDataPath", "data/processed/input.parquet")
             )
-            df = pd.read_parquet(inputPath)
+            table = pq.read_table(inputPath)
 
-        return {
-            "testX": df.drop("target", axis=1) if "target" in df.columns else df,
-            "historicalY": df["target"].values
-            if "target" in df.columns
-            else df.iloc[:, 0].values,
-        }
+        if "target" in table.column_names:
+            return {
+                "testX": table.drop_columns(["target"]).to_pandas(),
+                "historicalY": table.column("target").to_numpy(),
+            }
 
-    def _saveResults(self, results: Dict):
-        import pandas as pd
+        testX = table.to_pandas()
+        return {"testX": testX, "historicalY": testX.iloc[:, 0].to_numpy()}
 
+    def _saveResults(self, results: Dict):
         outputPath = Path(self.jobConfig.get("outputPath", "/app/output"))
         outputPath.mkdir(parents=True, exist_ok=True)
 
         resultsFile = outputPath / f"results_{self.jobId}.json"
-        with open(resultsFile, "w") as f:
-            json.dump(
-                {
-                    "predictions": results["predictions"].tolist()
-                    if hasattr(results["predictions"], "tolist")
-                    else results["predictions"],
-                    "crisisAnalysis": results["crisisAnalysis"],
-                    "recommendations": results["recommendations"],
-                },
-                f,
-                indent=2,
+        with open(resultsFile, "wb") as f:
+            f.write(
+                orjson.dumps(
+                    {
+                        "predictions": np.ascontiguousarray(results["predictions"]),
+                        "crisisAnalysis": results["crisisAnalysis"],
+                        "recommendations": results["recommendations"],
+                    },
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2,
+                )
             )
         logger.info(f"Saved results: {resultsFile}")
 
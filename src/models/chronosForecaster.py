@@ -67,13 +67,16 @@ class ChronosForecaster:
             print(f"Error during prediction: {e}")
             return None
 
+    def _toContextTensor(self, data: np.ndarray) -> torch.Tensor:
+        context = torch.from_numpy(np.ascontiguousarray(data, dtype=np.float32))
+        if context.dim() == 1:
+            context = context.unsqueeze(0)
+        return context
+
     def predictFromArray(
         self, data: np.ndarray, predictionLength: Optional[int] = None
     ) -> np.ndarray:
-        context = torch.tensor(data, dtype=torch.float32)
-
-        if len(context.shape) == 1:
-            context = context.unsqueeze(0)
+        context = self._toContextTensor(data)
 
         forecast = self.predict(context, predictionLength)
 
@@ -84,11 +87,22 @@ class ChronosForecaster:
     def predictBatch(
         self, dataList: List[np.ndarray], predictionLength: Optional[int] = None
     ) -> List[np.ndarray]:
-        results = []
-        for data in dataList:
-            prediction = self.predictFromArray(data, predictionLength)
-            results.append(prediction)
-        return results
+        if not dataList:
+            return []
+
+        maxLength = max(len(data) for data in dataList)
+        context = torch.full((len(dataList), maxLength), float("nan"), dtype=torch.float32)
+        for i, data in enumerate(dataList):
+            series = torch.as_tensor(np.asarray(data, dtype=np.float32).ravel())
+            context[i, maxLength - len(series):] = series
+
+        forecast = self.predict(context, predictionLength)
+
+        if forecast is None:
+            return [np.array([]) for _ in dataList]
+
+        means = forecast.float().mean(dim=1).cpu().numpy()
+        return [means[i : i + 1] for i in range(len(dataList))]
 
     def predictWithUncertainty(
         self,
@@ -96,32 +110,31 @@ class ChronosForecaster:
         predictionLength: Optional[int] = None,
         confidenceLevel: float = 0.95,
     ) -> dict:
-        context = torch.tensor(data, dtype=torch.float32)
-        if len(context.shape) == 1:
-            context = context.unsqueeze(0)
+        context = self._toContextTensor(data)
 
         forecast = self.predict(context, predictionLength)
 
         if forecast is not None:
-            forecastNumpy = forecast.numpy()
-
-            mean = forecastNumpy.mean(axis=1).squeeze()
-            median = np.median(forecastNumpy, axis=1).squeeze()
-            std = forecastNumpy.std(axis=1).squeeze()
-
             alpha = 1 - confidenceLevel
             lowerQuantile = alpha / 2
             upperQuantile = 1 - lowerQuantile
 
-            lower = np.quantile(forecastNumpy, lowerQuantile, axis=1).squeeze()
-            upper = np.quantile(forecastNumpy, upperQuantile, axis=1).squeeze()
+            forecast = forecast.float()
+            quantiles = torch.tensor(
+                [lowerQuantile, 0.5, upperQuantile],
+                device=forecast.device,
+                dtype=forecast.dtype,
+            )
+            lower, median, upper = torch.quantile(forecast, quantiles, dim=1)
+            var, mean = torch.var_mean(forecast, dim=1, correction=0)
+            stats = torch.stack([mean, median, var.sqrt_(), lower, upper]).cpu().numpy()
 
             return {
-                "mean": mean,
-                "median": median,
-                "std": std,
-                "lower": lower,
-                "upper": upper,
+                "mean": stats[0].squeeze(),
+                "median": stats[1].squeeze(),
+                "std": stats[2].squeeze(),
+                "lower": stats[3].squeeze(),
+                "upper": stats[4].squeeze(),
                 "confidenceLevel": confidenceLevel,
             }
         return {}
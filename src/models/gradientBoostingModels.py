@@ -1,11 +1,48 @@
+import os
 import xgboost as xgb
 from catboost import CatBoostRegressor
 import numpy as np
 import pandas as pd
 import torch
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from joblib import Parallel, delayed
 from typing import Optional, Dict, Tuple
 
+from utils.featureBinning import (
+    MISSING_BIN,
+    loadBinEdges,
+    prebinFeatures,
+    quantileBinEdges,
+    saveBinEdges,
+)
+
+
+def _regressionMetrics(y, predictions) -> Dict:
+    y = np.asarray(y, dtype=np.float64)
+    errors = y - predictions
+    sse = errors @ errors
+    centered = y - y.mean()
+    sst = centered @ centered
+
+    if sst > 0:
+        r2 = 1.0 - sse / sst
+    else:
+        r2 = 1.0 if sse == 0 else 0.0
+
+    return {
+        "rmse": np.sqrt(sse / len(y)),
+        "mae": np.abs(errors, out=errors).mean(),
+        "r2": r2,
+    }
+
+
+def _featureImportanceFrame(columns, importances) -> pd.DataFrame:
+    importances = np.asarray(importances)
+    order = np.argsort(-importances, kind="stable")
+    return pd.DataFrame(
+        {"feature": np.asarray(columns)[order], "importance": importances[order]},
+        index=order,
+    )
+
 
 class XGBoostForecaster:
     def __init__(
@@ -16,9 +53,11 @@ class XGBoostForecaster:
         subsample: float = 0.8,
         colsampleBytree: float = 0.8,
         randomState: int = 42,
+        maxBin: int = 255,
     ):
         self.useGpu = torch.cuda.is_available()
-        treeMethod = "gpu_hist" if self.useGpu else "hist"
+        self.maxBin = maxBin
+        self.binEdges = None
 
         self.params = {
             "n_estimators": nEstimators,
@@ -28,11 +67,14 @@ class XGBoostForecaster:
             "colsample_bytree": colsampleBytree,
             "random_state": randomState,
             "objective": "reg:squarederror",
-            "tree_method": treeMethod,
+            "tree_method": "hist",
+            "device": "cuda" if self.useGpu else "cpu",
+            "missing": MISSING_BIN,
         }
         self.model = None
         self.featureImportance = None
         self.earlyStoppingRounds = 50
+        self.minGpuRows = 10_000
 
     def train(
         self,
@@ -40,26 +82,38 @@ class XGBoostForecaster:
         y: pd.Series,
         evalSet: Optional[list] = None,
         verbose: bool = True,
+        paramOverrides: Optional[Dict] = None,
     ) -> Dict:
-        modelParams = self.params.copy()
+        modelParams = {**self.params, **(paramOverrides or {})}
+        if len(X) < self.minGpuRows:
+            modelParams["device"] = "cpu"
 
         if evalSet is not None:
-            modelParams["early_stopping_rounds"] = self.earlyStoppingRounds
-            modelParams["callbacks"] = [xgb.callback.EarlyStopping(rounds=self.earlyStoppingRounds)]
+            modelParams["callbacks"] = [
+                xgb.callback.EarlyStopping(
+                    rounds=self.earlyStoppingRounds, save_best=True, maximize=False
+                )
+            ]
 
         self.model = xgb.XGBRegressor(**modelParams)
 
-        fitParams = {"X": X, "y": y}
+        values = np.asarray(X, dtype=np.float64)
+        self.binEdges = quantileBinEdges(values, self.maxBin)
+
+        fitParams = {"X": prebinFeatures(values, self.binEdges), "y": y}
         if evalSet is not None:
-            fitParams["eval_set"] = evalSet
+            fitParams["eval_set"] = [
+                (prebinFeatures(evalX, self.binEdges), evalY) for evalX, evalY in evalSet
+            ]
         if verbose:
             fitParams["verbose"] = True
 
         self.model.fit(**fitParams)
+        saveBinEdges(self.model.get_booster(), self.binEdges)
 
-        self.featureImportance = pd.DataFrame(
-            {"feature": X.columns, "importance": self.model.feature_importances_}
-        ).sort_values("importance", ascending=False)
+        self.featureImportance = _featureImportanceFrame(
+            X.columns, self.model.feature_importances_
+        )
 
         bestIteration = getattr(self.model, "best_iteration", self.params["n_estimators"])
         bestScore = getattr(self.model, "best_score", None)
@@ -72,15 +126,20 @@ class XGBoostForecaster:
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         if self.model is None:
             raise ValueError("Model not trained yet")
-        return self.model.predict(X)
+        bestIteration = getattr(self.model, "best_iteration", None)
+        iterationRange = (0, bestIteration + 1) if bestIteration is not None else (0, 0)
+        if self.binEdges is None:
+            return self.model.get_booster().inplace_predict(
+                X, iteration_range=iterationRange
+            )
+        return self.model.get_booster().inplace_predict(
+            prebinFeatures(X, self.binEdges),
+            iteration_range=iterationRange,
+            missing=MISSING_BIN,
+        )
 
     def evaluate(self, X: pd.DataFrame, y: pd.Series) -> Dict:
-        predictions = self.predict(X)
-        return {
-            "rmse": np.sqrt(mean_squared_error(y, predictions)),
-            "mae": mean_absolute_error(y, predictions),
-            "r2": r2_score(y, predictions),
-        }
+        return _regressionMetrics(y, self.predict(X))
 
     def getFeatureImportance(self) -> pd.DataFrame:
         return self.featureImportance
@@ -92,6 +151,9 @@ class XGBoostForecaster:
     def loadModel(self, path: str):
         self.model = xgb.XGBRegressor()
         self.model.load_model(path)
+        self.binEdges = loadBinEdges(self.model.get_booster())
+        if self.binEdges is not None:
+            self.model.set_params(missing=MISSING_BIN)
 
 
 class CatBoostForecaster:
@@ -128,8 +190,9 @@ class CatBoostForecaster:
         y: pd.Series,
         evalSet: Optional[Tuple] = None,
         verbose: bool = True,
+        paramOverrides: Optional[Dict] = None,
     ) -> Dict:
-        self.model = CatBoostRegressor(**self.params)
+        self.model = CatBoostRegressor(**{**self.params, **(paramOverrides or {})})
 
         if verbose:
             self.model.set_params(verbose=100)
@@ -143,9 +206,9 @@ class CatBoostForecaster:
 
         self.model.fit(**fitParams)
 
-        self.featureImportance = pd.DataFrame(
-            {"feature": X.columns, "importance": self.model.feature_importances_}
-        ).sort_values("importance", ascending=False)
+        self.featureImportance = _featureImportanceFrame(
+            X.columns, self.model.feature_importances_
+        )
 
         bestIteration = getattr(self.model, "best_iteration_", self.params["iterations"])
         bestScore = getattr(self.model, "best_score_", None)
@@ -161,12 +224,7 @@ class CatBoostForecaster:
         return self.model.predict(X)
 
     def evaluate(self, X: pd.DataFrame, y: pd.Series) -> Dict:
-        predictions = self.predict(X)
-        return {
-            "rmse": np.sqrt(mean_squared_error(y, predictions)),
-            "mae": mean_absolute_error(y, predictions),
-            "r2": r2_score(y, predictions),
-        }
+        return _regressionMetrics(y, self.predict(X))
 
     def getFeatureImportance(self) -> pd.DataFrame:
         return self.featureImportance
@@ -199,11 +257,25 @@ class GradientBoostingEnsemble:
         device = torch.cuda.get_device_name(0) if torch.cuda.is_available() else "CPU"
         print(f"Training on: {device}")
 
-        print("Training XGBoost...")
-        xgbResults = self.xgbForecaster.train(X, y, evalSet=evalSetXgb)
+        threadsPerModel = max(1, (os.cpu_count() or 2) // 2)
+        xgbThreads = {
+            "n_jobs": self.xgbForecaster.params.get("n_jobs", threadsPerModel)
+        }
+        catboostThreads = {
+            "thread_count": self.catboostForecaster.params.get(
+                "thread_count", threadsPerModel
+            )
+        }
 
-        print("Training CatBoost...")
-        catboostResults = self.catboostForecaster.train(X, y, evalSet=evalSetCat)
+        print("Training XGBoost and CatBoost...")
+        xgbResults, catboostResults = Parallel(n_jobs=2, prefer="threads")([
+            delayed(self.xgbForecaster.train)(
+                X, y, evalSet=evalSetXgb, paramOverrides=xgbThreads
+            ),
+            delayed(self.catboostForecaster.train)(
+                X, y, evalSet=evalSetCat, paramOverrides=catboostThreads
+            ),
+        ])
 
         if valX is not None and valY is not None:
             self._optimizeBlendWeights(valX, valY)
@@ -214,47 +286,39 @@ class GradientBoostingEnsemble:
             "blendWeights": self.blendWeights,
         }
 
-    def _optimizeBlendWeights(self, X: pd.DataFrame, y: pd.Series):
-        xgbPred = self.xgbForecaster.predict(X)
-        catPred = self.catboostForecaster.predict(X)
+    def _predictModels(self, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        xgbPred, catPred = Parallel(n_jobs=2, prefer="threads")(
+            delayed(forecaster.predict)(X)
+            for forecaster in (self.xgbForecaster, self.catboostForecaster)
+        )
+        return xgbPred, catPred
 
-        bestRmse = float("inf")
-        bestWeight = 0.5
+    def _blend(self, xgbPred: np.ndarray, catPred: np.ndarray) -> np.ndarray:
+        return (
+            self.blendWeights["xgboost"] * xgbPred
+            + self.blendWeights["catboost"] * catPred
+        )
 
-        for weight in np.arange(0, 1.1, 0.1):
-            blendedPred = weight * xgbPred + (1 - weight) * catPred
-            rmse = np.sqrt(mean_squared_error(y, blendedPred))
+    def _optimizeBlendWeights(self, X: pd.DataFrame, y: pd.Series):
+        xgbPred, catPred = self._predictModels(X)
 
-            if rmse < bestRmse:
-                bestRmse = rmse
-                bestWeight = weight
+        diff = np.asarray(xgbPred, dtype=np.float64) - catPred
+        residual = np.asarray(y, dtype=np.float64) - catPred
+        bestWeight = float(np.clip(diff @ residual / (diff @ diff + 1e-12), 0.0, 1.0))
 
         self.blendWeights = {"xgboost": bestWeight, "catboost": 1 - bestWeight}
         print(f"Optimized blend weights: {self.blendWeights}")
 
     def predict(self, X: pd.DataFrame) -> np.ndarray:
-        xgbPred = self.xgbForecaster.predict(X)
-        catPred = self.catboostForecaster.predict(X)
-
-        blended = (
-            self.blendWeights["xgboost"] * xgbPred
-            + self.blendWeights["catboost"] * catPred
-        )
-
-        return blended
+        return self._blend(*self._predictModels(X))
 
     def evaluate(self, X: pd.DataFrame, y: pd.Series) -> Dict:
-        predictions = self.predict(X)
-
-        xgbMetrics = self.xgbForecaster.evaluate(X, y)
-        catboostMetrics = self.catboostForecaster.evaluate(X, y)
+        xgbPred, catPred = self._predictModels(X)
 
-        return {
-            "ensemble": {
-                "rmse": np.sqrt(mean_squared_error(y, predictions)),
-                "mae": mean_absolute_error(y, predictions),
-                "r2": r2_score(y, predictions),
-            },
-            "xgboost": xgbMetrics,
-            "catboost": catboostMetrics,
+        predictions = {
+            "ensemble": self._blend(xgbPred, catPred),
+            "xgboost": xgbPred,
+            "catboost": catPred,
         }
+
+        return {name: _regressionMetrics(y, pred) for name, pred in predictions.items()}
@@ -21,8 +21,8 @@ class SpatialEncoder(nn.Module):
         self.dropout = dropout
 
         if aggregation == "gcn":
-            self.conv1 = GCNConv(inChannels, hiddenChannels)
-            self.conv2 = GCNConv(hiddenChannels, outChannels)
+            self.conv1 = GCNConv(inChannels, hiddenChannels, cached=True)
+            self.conv2 = GCNConv(hiddenChannels, outChannels, cached=True)
         elif aggregation == "graphsage":
             self.conv1 = SAGEConv(inChannels, hiddenChannels)
             self.conv2 = SAGEConv(hiddenChannels, outChannels)
@@ -32,6 +32,13 @@ class SpatialEncoder(nn.Module):
         else:
             raise ValueError(f"Unknown aggregation: {aggregation}")
 
+    def prepareAdjacency(self, edgeIndex: torch.Tensor) -> torch.Tensor:
+        if self.aggregation == "gcn":
+            for conv in (self.conv1, self.conv2):
+                conv._cached_edge_index = None
+                conv._cached_adj_t = None
+        return edgeIndex
+
     def forward(self, x: torch.Tensor, edgeIndex: torch.Tensor) -> torch.Tensor:
         x = self.conv1(x, edgeIndex)
         x = F.relu(x)
@@ -105,27 +112,49 @@ class STGNNModel(nn.Module):
             nn.Linear(hiddenChannels, forecastHorizon),
         )
 
+        self._edgeIndexSource = None
+        self._edgeIndexLength = None
+        self._batchedEdgeIndex = None
+
+    def _batchEdgeIndex(
+        self, edgeIndex: torch.Tensor, temporalLength: int
+    ) -> torch.Tensor:
+        if (
+            self._edgeIndexLength != temporalLength
+            or self._edgeIndexSource is None
+            or self._edgeIndexSource.shape != edgeIndex.shape
+            or self._edgeIndexSource.device != edgeIndex.device
+            or not torch.equal(self._edgeIndexSource, edgeIndex)
+        ):
+            offsets = torch.arange(temporalLength, device=edgeIndex.device)
+            offsets = offsets * self.numNodes
+            batchedEdgeIndex = (
+                edgeIndex.unsqueeze(1) + offsets.view(1, -1, 1)
+            ).reshape(2, -1)
+            self._batchedEdgeIndex = self.spatialEncoder.prepareAdjacency(
+                batchedEdgeIndex
+            )
+            self._edgeIndexSource = edgeIndex.clone()
+            self._edgeIndexLength = temporalLength
+        return self._batchedEdgeIndex
+
     def forward(
         self, x: torch.Tensor, edgeIndex: torch.Tensor, temporalLength: int
     ) -> torch.Tensor:
-        batchSize = x.shape[0] // self.numNodes
-
-        spatialFeatures = []
-        for t in range(temporalLength):
-            startIdx = t * self.numNodes
-            endIdx = (t + 1) * self.numNodes
-            xt = x[startIdx:endIdx]
+        batchedEdgeIndex = self._batchEdgeIndex(edgeIndex, temporalLength)
 
-            spatialOut = self.spatialEncoder(xt, edgeIndex)
-            spatialFeatures.append(spatialOut)
-
-        spatialFeaturesTensor = torch.stack(spatialFeatures, dim=1)
+        spatialOut = self.spatialEncoder(
+            x[: temporalLength * self.numNodes], batchedEdgeIndex
+        )
+        spatialFeaturesTensor = spatialOut.view(
+            temporalLength, self.numNodes, -1
+        ).transpose(0, 1)
 
         temporalOut, _ = self.temporalEncoder(spatialFeaturesTensor)
 
-        attentionScores = self.attentionWeight(temporalOut)
+        attentionScores = self.attentionWeight(temporalOut).squeeze(-1)
         attentionWeights = F.softmax(attentionScores, dim=1)
-        contextVector = (temporalOut * attentionWeights).sum(dim=1)
+        contextVector = torch.einsum("bth,bt->bh", temporalOut, attentionWeights)
 
         predictions = self.decoder(contextVector)
 
@@ -156,6 +185,15 @@ class STGNNForecaster:
             forecastHorizon=forecastHorizon,
         ).to(self.device)
 
+        self.useAmp = self.device == "cuda" and torch.cuda.is_bf16_supported()
+        if self.device == "cuda":
+            torch.set_float32_matmul_precision("high")
+            self.compiledModel = torch.compile(
+                self.model, mode="reduce-overhead", dynamic=False
+            )
+        else:
+            self.compiledModel = self.model
+
         self.optimizer = None
         self.criterion = nn.MSELoss()
 
@@ -176,27 +214,30 @@ class STGNNForecaster:
             self.initOptimizer()
 
         self.model.train()
-        losses = []
+        losses = torch.empty(epochs, device=self.device)
 
         x = x.to(self.device)
         edgeIndex = edgeIndex.to(self.device)
         y = y.to(self.device)
 
         for epoch in range(epochs):
-            self.optimizer.zero_grad()
+            self.optimizer.zero_grad(set_to_none=True)
 
-            predictions = self.model(x, edgeIndex, temporalLength)
-            loss = self.criterion(predictions, y)
+            with torch.autocast(
+                self.device, dtype=torch.bfloat16, enabled=self.useAmp
+            ):
+                predictions = self.compiledModel(x, edgeIndex, temporalLength)
+            loss = self.criterion(predictions.float(), y)
 
             loss.backward()
             self.optimizer.step()
 
-            losses.append(loss.item())
+            losses[epoch] = loss.detach()
 
             if (epoch + 1) % 10 == 0:
-                print(f"Epoch {epoch + 1}/{epochs}, Loss: {loss.item():.4f}")
+                print(f"Epoch {epoch + 1}/{epochs}, Loss: {losses[epoch].item():.4f}")
 
-        return losses
+        return losses.cpu().tolist()
 
     def predict(
         self, x: torch.Tensor, edgeIndex: torch.Tensor, temporalLength: int
@@ -206,10 +247,12 @@ class STGNNForecaster:
         x = x.to(self.device)
         edgeIndex = edgeIndex.to(self.device)
 
-        with torch.no_grad():
-            predictions = self.model(x, edgeIndex, temporalLength)
+        with torch.no_grad(), torch.autocast(
+            self.device, dtype=torch.bfloat16, enabled=self.useAmp
+        ):
+            predictions = self.compiledModel(x, edgeIndex, temporalLength)
 
-        return predictions.cpu().numpy()
+        return predictions.float().cpu().numpy()
 
     def saveModel(self, path: str):
         torch.save(self.model.state_dict(), path)
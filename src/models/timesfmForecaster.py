@@ -57,6 +57,14 @@ class TimesFMForecaster:
         except Exception as e:
             print(f"Error compiling model: {e}")
 
+    def _packInputs(self, inputs: List[np.ndarray]) -> np.ndarray:
+        length = min(self.maxContext, max(len(series) for series in inputs))
+        packed = np.full((len(inputs), length), np.nan, dtype=np.float32)
+        for i, series in enumerate(inputs):
+            tail = series[-length:]
+            packed[i, length - len(tail) :] = tail
+        return packed
+
     def forecast(
         self, inputs: List[np.ndarray], horizon: int = 12
     ) -> Tuple[np.ndarray, np.ndarray]:
@@ -66,7 +74,7 @@ class TimesFMForecaster:
         try:
             pointForecast, quantileForecast = self.model.forecast(
                 horizon=horizon,
-                inputs=inputs,
+                inputs=self._packInputs(inputs),
             )
             return pointForecast, quantileForecast
         except Exception as e:
@@ -80,17 +88,17 @@ class TimesFMForecaster:
         pointForecast, _ = self.forecast(series, horizon)
 
         if pointForecast is not None:
-            return pointForecast[0] if len(pointForecast) > 0 else np.array([])
+            return pointForecast[0]
         return np.array([])
 
     def predictBatch(
         self, seriesList: List[np.ndarray], horizon: int = 12
-    ) -> List[np.ndarray]:
+    ) -> np.ndarray:
         pointForecast, _ = self.forecast(seriesList, horizon)
 
         if pointForecast is not None:
-            return [pointForecast[i] for i in range(len(pointForecast))]
-        return []
+            return pointForecast
+        return np.empty((0, horizon))
 
     def getModelInfo(self):
         return {
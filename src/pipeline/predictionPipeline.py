@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from numba import njit
 from typing import Dict, List, Optional
 from pathlib import Path
 import sys
@@ -8,6 +9,75 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.configLoader import ConfigLoader
 
+LEVEL_RECOMMENDATIONS = {
+    "HIGH": (
+        "EMERGENCY: Implement dynamic rent control mechanisms",
+        "Activate emergency housing voucher programs",
+        "Fast-track development approvals in high-demand areas",
+        "Increase affordable housing supply through public-private partnerships",
+        "Monitor market daily for rapid intervention",
+    ),
+    "MEDIUM": (
+        "PREVENTIVE: Optimize zoning regulations for increased density",
+        "Identify development sites through spatial analysis",
+        "Implement targeted housing subsidies for at-risk populations",
+        "Enhance monitoring frequency to weekly assessments",
+        "Prepare contingency plans for potential escalation",
+    ),
+    "LOW": (
+        "OPTIMIZATION: Continue routine market monitoring",
+        "Refine predictive models with latest data",
+        "Conduct policy impact simulations",
+        "Analyze long-term market trends",
+        "Maintain early warning system vigilance",
+    ),
+}
+
+ENSEMBLE_PRIORITY = ("autoGluon", "stackedEnsemble", "gradientBoosting")
+
+
+@njit(cache=True, error_model="numpy", boundscheck=False)
+def _crisisStatistics(predictions, last):
+    n = predictions.shape[0]
+    percentChange = np.empty(n, dtype=np.float32)
+    mean = 0.0
+    m2 = 0.0
+    declines = 0
+    appreciations = 0
+    for i in range(n):
+        value = predictions[i]
+        change = (value - last) / last * 100
+        percentChange[i] = change
+        declines += change < -10
+        appreciations += change > 20
+
+        delta = value - mean
+        mean += delta / (i + 1)
+        m2 += delta * (value - mean)
+
+    return percentChange, np.sqrt(m2 / n), declines / n, appreciations / n
+
+
+@njit(cache=True, boundscheck=False)
+def _predictionSummary(predictions):
+    n = predictions.shape[0]
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan
+
+    mean = 0.0
+    m2 = 0.0
+    low = predictions[0]
+    high = predictions[0]
+    for i in range(n):
+        value = predictions[i]
+        delta = value - mean
+        mean += delta / (i + 1)
+        m2 += delta * (value - mean)
+        low = min(low, value)
+        high = max(high, value)
+
+    return mean, low, high, np.sqrt(m2 / n)
+
 
 class CrisisDetector:
     def __init__(self, configPath: str = "config/config.yaml"):
@@ -22,15 +92,15 @@ class CrisisDetector:
     def detectCrisisLevel(
         self, predictions: np.ndarray, historical: np.ndarray
     ) -> Dict:
-        percentChange = ((predictions - historical[-1]) / historical[-1]) * 100
+        predictions = np.asarray(predictions, dtype=np.float32)
+        percentChange, volatility, priceDeclineRisk, rapidAppreciationRisk = (
+            _crisisStatistics(predictions.ravel(), float(historical[-1]))
+        )
+        percentChange = percentChange.reshape(predictions.shape)
 
-        volatility = np.std(predictions)
         historicalVolatility = np.std(historical[-12:])
         volatilityIncrease = (volatility / historicalVolatility) - 1
 
-        priceDeclineRisk = np.mean(percentChange < -10)
-        rapidAppreciationRisk = np.mean(percentChange > 20)
-
         crisisScore = (
             0.4 * priceDeclineRisk
             + 0.3 * rapidAppreciationRisk
@@ -54,39 +124,10 @@ class CrisisDetector:
         }
 
     def generateRecommendations(self, crisisAnalysis: Dict) -> List[str]:
-        recommendations = []
         level = crisisAnalysis["crisisLevel"]
-
-        if level == "HIGH":
-            recommendations.extend(
-                [
-                    "EMERGENCY: Implement dynamic rent control mechanisms",
-                    "Activate emergency housing voucher programs",
-                    "Fast-track development approvals in high-demand areas",
-                    "Increase affordable housing supply through public-private partnerships",
-                    "Monitor market daily for rapid intervention",
-                ]
-            )
-        elif level == "MEDIUM":
-            recommendations.extend(
-                [
-                    "PREVENTIVE: Optimize zoning regulations for increased density",
-                    "Identify development sites through spatial analysis",
-                    "Implement targeted housing subsidies for at-risk populations",
-                    "Enhance monitoring frequency to weekly assessments",
-                    "Prepare contingency plans for potential escalation",
-                ]
-            )
-        else:
-            recommendations.extend(
-                [
-                    "OPTIMIZATION: Continue routine market monitoring",
-                    "Refine predictive models with latest data",
-                    "Conduct policy impact simulations",
-                    "Analyze long-term market trends",
-                    "Maintain early warning system vigilance",
-                ]
-            )
+        recommendations = list(
+            LEVEL_RECOMMENDATIONS.get(level, LEVEL_RECOMMENDATIONS["LOW"])
+        )
 
         if crisisAnalysis["priceDeclineRisk"] > 0.3:
             recommendations.append(
@@ -109,18 +150,28 @@ class CrisisDetector:
 class PredictionPipeline:
     def __init__(self, models: Dict, configPath: str = "config/config.yaml"):
         self.models = models
+        self._activeModel = None
         self.config = ConfigLoader(configPath)
         self.crisisDetector = CrisisDetector(configPath)
 
     def predictWithEnsemble(self, X: pd.DataFrame) -> np.ndarray:
-        if "autoGluon" in self.models:
-            return self.models["autoGluon"].predict(X)
-        elif "stackedEnsemble" in self.models:
-            return self.models["stackedEnsemble"].predict(X)
-        elif "gradientBoosting" in self.models:
-            return self.models["gradientBoosting"].predict(X)
-        else:
-            raise ValueError("No trained ensemble model found")
+        if self._activeModel is None:
+            self._activeModel = self._resolveEnsembleModel()
+        return np.asarray(self._activeModel.predict(X), dtype=np.float32)
+
+    def _resolveEnsembleModel(self):
+        for name in ENSEMBLE_PRIORITY:
+            model = self.models.get(name)
+            if model is not None:
+                return model
+        raise ValueError("No trained ensemble model found")
+
+    def predictBatchWithEnsemble(self, Xs: List[pd.DataFrame]) -> List[np.ndarray]:
+        if not Xs:
+            return []
+
+        predictions = self.predictWithEnsemble(pd.concat(Xs, ignore_index=True))
+        return np.split(predictions, np.cumsum([len(X) for X in Xs[:-1]]))
 
     def generateForecast(
         self, X: pd.DataFrame, historicalData: np.ndarray, horizon: int = 12
@@ -143,40 +194,43 @@ class PredictionPipeline:
     def generateReport(
         self, forecastResult: Dict, targetName: str = "Housing Price Index"
     ) -> str:
-        report = []
-        report.append("=" * 70)
-        report.append("HOUSING CRISIS PREDICTION REPORT")
-        report.append("=" * 70)
-        report.append(f"\nTarget: {targetName}")
-        report.append(f"Forecast Horizon: {forecastResult['horizon']} months")
-
         crisis = forecastResult["crisisAnalysis"]
-        report.append(f"\n{'=' * 70}")
-        report.append("CRISIS ASSESSMENT")
-        report.append(f"{'=' * 70}")
-        report.append(f"Crisis Level: {crisis['crisisLevel']}")
-        report.append(f"Crisis Score: {crisis['crisisScore']:.3f}")
-        report.append(f"Price Decline Risk: {crisis['priceDeclineRisk']:.1%}")
-        report.append(f"Rapid Appreciation Risk: {crisis['rapidAppreciationRisk']:.1%}")
-        report.append(f"Volatility Increase: {crisis['volatilityIncrease']:.1%}")
-
-        report.append(f"\n{'=' * 70}")
-        report.append("POLICY RECOMMENDATIONS")
-        report.append(f"{'=' * 70}")
-        for i, rec in enumerate(forecastResult["recommendations"], 1):
-            report.append(f"{i}. {rec}")
-
-        report.append(f"\n{'=' * 70}")
-        report.append("FORECAST SUMMARY")
-        report.append(f"{'=' * 70}")
-        preds = forecastResult["predictions"]
-        report.append(f"Mean Predicted Value: {np.mean(preds):.2f}")
-        report.append(f"Predicted Range: [{np.min(preds):.2f}, {np.max(preds):.2f}]")
-        report.append(f"Predicted Std Dev: {np.std(preds):.2f}")
-
-        report.append(f"\n{'=' * 70}")
-
-        return "\n".join(report)
+        predMean, predMin, predMax, predStd = _predictionSummary(
+            np.asarray(forecastResult["predictions"], dtype=np.float32).ravel()
+        )
+        divider = "=" * 70
+        recommendations = "".join(
+            f"\n{i}. {rec}" for i, rec in enumerate(forecastResult["recommendations"], 1)
+        )
+
+        return f"""{divider}
+HOUSING CRISIS PREDICTION REPORT
+{divider}
+
+Target: {targetName}
+Forecast Horizon: {forecastResult['horizon']} months
+
+{divider}
+CRISIS ASSESSMENT
+{divider}
+Crisis Level: {crisis['crisisLevel']}
+Crisis Score: {crisis['crisisScore']:.3f}
+Price Decline Risk: {crisis['priceDeclineRisk']:.1%}
+Rapid Appreciation Risk: {crisis['rapidAppreciationRisk']:.1%}
+Volatility Increase: {crisis['volatilityIncrease']:.1%}
+
+{divider}
+POLICY RECOMMENDATIONS
+{divider}{recommendations}
+
+{divider}
+FORECAST SUMMARY
+{divider}
+Mean Predicted Value: {predMean:.2f}
+Predicted Range: [{predMin:.2f}, {predMax:.2f}]
+Predicted Std Dev: {predStd:.2f}
+
+{divider}"""
 
     def runPrediction(
         self,
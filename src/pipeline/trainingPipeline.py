@@ -4,15 +4,16 @@ import sys
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from models.timesfmForecaster import TimesFMForecaster
-from models.chronosForecaster import ChronosForecaster
-from models.stgnnModel import STGNNForecaster
 from models.gradientBoostingModels import GradientBoostingEnsemble
 from ensemble.stackedEnsemble import StackedEnsemble, AutoGluonEnsemble
 from data.dataCollector import DataCollector
 from data.featureEngineer import FeatureEngineer
 from utils.configLoader import ConfigLoader
-from typing import Dict, Tuple, Optional
+from typing import Dict, Tuple, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from models.timesfmForecaster import TimesFMForecaster
+    from models.chronosForecaster import ChronosForecaster
 
 
 class TrainingPipeline:
@@ -81,7 +82,9 @@ class TrainingPipeline:
             "testY": testY,
         }
 
-    def trainTimesFM(self, data: Dict) -> TimesFMForecaster:
+    def trainTimesFM(self, data: Dict) -> "TimesFMForecaster":
+        from models.timesfmForecaster import TimesFMForecaster
+
         print("\nTraining TimesFM model...")
         timesfmConfig = self.config.getModelConfig("timesfm")
 
@@ -97,7 +100,9 @@ class TrainingPipeline:
         print("TimesFM model ready for forecasting")
         return forecaster
 
-    def trainChronos(self, data: Dict) -> ChronosForecaster:
+    def trainChronos(self, data: Dict) -> "ChronosForecaster":
+        from models.chronosForecaster import ChronosForecaster
+
         print("\nTraining Chronos model...")
         chronosConfig = self.config.getModelConfig("chronos")
 
@@ -135,7 +140,9 @@ class TrainingPipeline:
         print("\nCreating stacked ensemble...")
 
         ensemble = StackedEnsemble(
-            metaLearnerType="ridge", metaLearnerParams={"alpha": 1.0}
+            metaLearnerType="ridge",
+            metaLearnerParams={"alpha": 1.0},
+            nJobs=self.config.getEnsembleConfig().get("nJobs", -1),
         )
 
         for name, model in baseModels.items():
@@ -158,11 +165,12 @@ class TrainingPipeline:
         print("\nTraining AutoGluon ensemble...")
         ensembleConfig = self.config.getEnsembleConfig()
 
-        trainData = data["trainX"].copy()
-        trainData[targetColumn] = data["trainY"]
-
-        valData = data["valX"].copy()
-        valData[targetColumn] = data["valY"]
+        trainData = pd.concat(
+            [data["trainX"], data["trainY"].rename(targetColumn)], axis=1, copy=False
+        )
+        valData = pd.concat(
+            [data["valX"], data["valY"].rename(targetColumn)], axis=1, copy=False
+        )
 
         ensemble = AutoGluonEnsemble(
             timeLimit=ensembleConfig["timeLimit"],
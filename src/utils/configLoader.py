@@ -1,15 +1,29 @@
+import copy
 import yaml
 from pathlib import Path
 
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class ConfigLoader:
+    _cache = {}
+
     def __init__(self, configPath="config/config.yaml"):
         self.configPath = Path(configPath)
         self.config = self._loadConfig()
 
     def _loadConfig(self):
-        with open(self.configPath, "r") as file:
-            return yaml.safe_load(file)
+        path = self.configPath.resolve()
+        mtime = path.stat().st_mtime_ns
+
+        cached = ConfigLoader._cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return copy.deepcopy(cached[1])
+
+        with open(path, "r") as file:
+            config = yaml.load(file, Loader=_YAML_LOADER)
+        ConfigLoader._cache[path] = (mtime, config)
+        return copy.deepcopy(config)
 
     def getDataConfig(self):
         return self.config["data"]
@@ -0,0 +1,40 @@
+import json
+import numpy as np
+
+MISSING_BIN = 255
+BIN_EDGES_ATTR = "binEdges"
+
+
+def quantileBinEdges(values: np.ndarray, maxBin: int) -> np.ndarray:
+    numEdges = min(maxBin, MISSING_BIN - 1)
+    return np.nanquantile(values, np.linspace(0, 1, numEdges), axis=0).T.copy()
+
+
+def prebinFeatures(X, binEdges: np.ndarray) -> np.ndarray:
+    values = np.asarray(X, dtype=np.float64)
+    binned = np.empty(values.shape, dtype=np.uint8, order="F")
+    for j, edges in enumerate(binEdges):
+        column = values[:, j]
+        binned[:, j] = np.searchsorted(edges, column)
+        binned[np.isnan(column), j] = MISSING_BIN
+    return binned
+
+
+def loadBinEdges(booster) -> np.ndarray:
+    binEdges = booster.attr(BIN_EDGES_ATTR)
+    return np.asarray(json.loads(binEdges)) if binEdges else None
+
+
+def saveBinEdges(booster, binEdges: np.ndarray) -> None:
+    booster.set_attr(**{BIN_EDGES_ATTR: json.dumps(binEdges.tolist())})
+
+
+class BinnedBooster:
+    def __init__(self, booster, binEdges: np.ndarray):
+        self.booster = booster
+        self.binEdges = binEdges
+
+    def predict(self, X) -> np.ndarray:
+        return self.booster.inplace_predict(
+            prebinFeatures(X, self.binEdges), missing=MISSING_BIN
+        )
@@ -5,11 +5,34 @@ from torch_geometric.data import Data
 from typing import List, Tuple, Optional
 from sklearn.metrics.pairwise import haversine_distances
 
+DENSE_DISTANCE_MAX_NODES = 1000
+MAX_HASHED_NODES = 3_037_000_499
+SIMILARITY_CHUNK_ROWS = 1024
+KM_PER_DEGREE = 111.0
+
 
 class SpatialGraphBuilder:
     def __init__(self, distanceThreshold: float = 100.0, method: str = "knn"):
         self.distanceThreshold = distanceThreshold
         self.method = method
+        self._treeCache = None
+
+    def clearCache(self) -> None:
+        self._treeCache = None
+
+    def _haversineTree(self, coordinates: np.ndarray):
+        coordinates = np.asarray(coordinates)
+        if self._treeCache is not None:
+            cachedCoordinates, tree, coordsRad = self._treeCache
+            if np.array_equal(cachedCoordinates, coordinates):
+                return tree, coordsRad
+
+        from sklearn.neighbors import BallTree
+
+        coordsRad = np.radians(coordinates)
+        tree = BallTree(coordsRad, metric="haversine")
+        self._treeCache = (coordinates.copy(), tree, coordsRad)
+        return tree, coordsRad
 
     def buildGraphFromCoordinates(
         self, coordinates: np.ndarray, k: int = 5
@@ -20,6 +43,8 @@ class SpatialGraphBuilder:
             edges = self._buildKnnGraph(coordinates, k)
         elif self.method == "distance":
             edges = self._buildDistanceGraph(coordinates)
+        elif self.method == "distance_euclid":
+            edges = self._buildEuclideanDistanceGraph(coordinates)
         elif self.method == "delaunay":
             edges = self._buildDelaunayGraph(coordinates)
         else:
@@ -27,77 +52,82 @@ class SpatialGraphBuilder:
 
         return edges
 
+    @staticmethod
+    def _symmetricEdgeIndex(src: np.ndarray, dst: np.ndarray) -> torch.Tensor:
+        edges = np.empty((2, 2 * len(src)), dtype=np.int64)
+        edges[0, 0::2] = src
+        edges[1, 0::2] = dst
+        edges[0, 1::2] = dst
+        edges[1, 1::2] = src
+        return torch.from_numpy(edges)
+
     def _buildKnnGraph(self, coordinates: np.ndarray, k: int) -> torch.Tensor:
-        from sklearn.neighbors import NearestNeighbors
+        tree, coordsRad = self._haversineTree(coordinates)
+        distances, indices = tree.query(coordsRad, k=k + 1)
 
-        nbrs = NearestNeighbors(n_neighbors=k + 1, metric="haversine")
-        nbrs.fit(np.radians(coordinates))
+        src = np.repeat(np.arange(len(coordinates)), k)
+        return self._symmetricEdgeIndex(src, indices[:, 1:].ravel())
 
-        distances, indices = nbrs.kneighbors(np.radians(coordinates))
+    def _buildDistanceGraph(self, coordinates: np.ndarray) -> torch.Tensor:
+        if len(coordinates) < DENSE_DISTANCE_MAX_NODES:
+            distances = haversine_distances(np.radians(coordinates)) * 6371
+            src, dst = np.nonzero(np.triu(distances < self.distanceThreshold, k=1))
+            return self._symmetricEdgeIndex(src, dst)
 
-        edgeList = []
-        for i in range(len(coordinates)):
-            for j in range(1, k + 1):
-                edgeList.append([i, indices[i][j]])
-                edgeList.append([indices[i][j], i])
+        tree, coordsRad = self._haversineTree(coordinates)
+        neighbors, distances = tree.query_radius(
+            coordsRad, r=self.distanceThreshold / 6371, return_distance=True
+        )
 
-        edgeIndex = torch.tensor(edgeList, dtype=torch.long).t().contiguous()
-        return edgeIndex
+        src = np.repeat(np.arange(len(coordinates)), [len(n) for n in neighbors])
+        dst = np.concatenate(neighbors)
+        withinThreshold = np.concatenate(distances) * 6371 < self.distanceThreshold
+        keep = (dst > src) & withinThreshold
+        src, dst = src[keep], dst[keep]
 
-    def _buildDistanceGraph(self, coordinates: np.ndarray) -> torch.Tensor:
-        coordsRad = np.radians(coordinates)
-        distances = haversine_distances(coordsRad) * 6371
+        order = np.lexsort((dst, src))
+        return self._symmetricEdgeIndex(src[order], dst[order])
 
-        edgeList = []
-        numNodes = len(coordinates)
+    def _buildEuclideanDistanceGraph(self, coordinates: np.ndarray) -> torch.Tensor:
+        from scipy.spatial import cKDTree
 
-        for i in range(numNodes):
-            for j in range(i + 1, numNodes):
-                if distances[i, j] < self.distanceThreshold:
-                    edgeList.append([i, j])
-                    edgeList.append([j, i])
+        tree = cKDTree(coordinates)
+        pairs = tree.query_pairs(
+            r=self.distanceThreshold / KM_PER_DEGREE, output_type="ndarray"
+        )
 
-        edgeIndex = torch.tensor(edgeList, dtype=torch.long).t().contiguous()
-        return edgeIndex
+        order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+        return self._symmetricEdgeIndex(pairs[order, 0], pairs[order, 1])
 
     def _buildDelaunayGraph(self, coordinates: np.ndarray) -> torch.Tensor:
         from scipy.spatial import Delaunay
 
         tri = Delaunay(coordinates)
 
-        edgeSet = set()
-        for simplex in tri.simplices:
-            for i in range(3):
-                for j in range(i + 1, 3):
-                    edge = tuple(sorted([simplex[i], simplex[j]]))
-                    edgeSet.add(edge)
-
-        edgeList = []
-        for edge in edgeSet:
-            edgeList.append([edge[0], edge[1]])
-            edgeList.append([edge[1], edge[0]])
-
-        edgeIndex = torch.tensor(edgeList, dtype=torch.long).t().contiguous()
-        return edgeIndex
+        pairs = tri.simplices[:, [[0, 1], [0, 2], [1, 2]]].reshape(-1, 2)
+        edges = np.unique(np.sort(pairs, axis=1), axis=0)
+        return self._symmetricEdgeIndex(edges[:, 0], edges[:, 1])
 
     def buildGraphFromEconomicSimilarity(
         self, features: pd.DataFrame, threshold: float = 0.7
     ) -> torch.Tensor:
-        from sklearn.metrics.pairwise import cosine_similarity
-
-        similarity = cosine_similarity(features)
-
-        edgeList = []
-        numNodes = len(features)
-
-        for i in range(numNodes):
-            for j in range(i + 1, numNodes):
-                if similarity[i, j] > threshold:
-                    edgeList.append([i, j])
-                    edgeList.append([j, i])
-
-        edgeIndex = torch.tensor(edgeList, dtype=torch.long).t().contiguous()
-        return edgeIndex
+        values = np.asarray(features, dtype=np.float64)
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        normalized = values / norms
+
+        srcChunks, dstChunks = [], []
+        for start in range(0, len(normalized), SIMILARITY_CHUNK_ROWS):
+            chunk = normalized[start : start + SIMILARITY_CHUNK_ROWS]
+            similarity = chunk @ normalized.T
+            src, dst = np.nonzero(np.triu(similarity > threshold, k=start + 1))
+            srcChunks.append(src + start)
+            dstChunks.append(dst)
+
+        return self._symmetricEdgeIndex(
+            np.concatenate(srcChunks) if srcChunks else np.empty(0, dtype=np.int64),
+            np.concatenate(dstChunks) if dstChunks else np.empty(0, dtype=np.int64),
+        )
 
     def buildMultiRelationalGraph(
         self,
@@ -106,10 +136,18 @@ class SpatialGraphBuilder:
         weights: Tuple[float, float] = (0.6, 0.4),
     ) -> torch.Tensor:
         allEdges = torch.cat([spatialEdges, economicEdges], dim=1)
+        if allEdges.shape[1] == 0:
+            return allEdges
 
-        uniqueEdges = torch.unique(allEdges, dim=1)
+        numNodes = int(allEdges.max()) + 1
+        if numNodes > MAX_HASHED_NODES:
+            return torch.unique(allEdges, dim=1)
 
-        return uniqueEdges
+        edges = allEdges.cpu().numpy().astype(np.int64, copy=False)
+        keys = np.unique(edges[0] * numNodes + edges[1])
+        return torch.from_numpy(np.stack(np.divmod(keys, numNodes))).to(
+            allEdges.device
+        )
 
     def createPyGData(
         self,
@@ -141,15 +179,30 @@ class TemporalGraphBuilder:
 
         numSnapshots = len(timeSeriesData) // self.snapshotInterval
 
+        codes, uniques = pd.factorize(
+            timeSeriesData.index.get_level_values(0), sort=True
+        )
+        values = timeSeriesData.to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        validCounts = valid.astype(np.float64)
+
         for t in range(windowSize, numSnapshots):
-            windowData = timeSeriesData.iloc[
-                (t - windowSize) * self.snapshotInterval : t * self.snapshotInterval
-            ]
+            start = (t - windowSize) * self.snapshotInterval
+            end = t * self.snapshotInterval
+            windowCodes = codes[start:end]
+
+            sums = np.zeros((len(uniques), values.shape[1]))
+            counts = np.zeros((len(uniques), values.shape[1]))
+            np.add.at(sums, windowCodes, filled[start:end])
+            np.add.at(counts, windowCodes, validCounts[start:end])
 
-            aggregatedFeatures = windowData.groupby(level=0).mean().values
+            present = np.bincount(windowCodes, minlength=len(uniques)) > 0
+            with np.errstate(invalid="ignore"):
+                aggregatedFeatures = sums[present] / counts[present]
 
             graphData = Data(
-                x=torch.tensor(aggregatedFeatures, dtype=torch.float),
+                x=torch.from_numpy(aggregatedFeatures.astype(np.float32)),
                 edge_index=spatialEdges,
                 timestamp=t,
             )
@@ -1,14 +1,13 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
-import plotly.graph_objects as go
-import plotly.express as px
 
 
 class Visualizer:
     def __init__(self, style: str = "seaborn-v0_8-darkgrid"):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.style.use(style)
         sns.set_palette("husl")
 
@@ -19,6 +18,8 @@ class Visualizer:
         title: str = "Time Series Data",
         figsize: tuple = (15, 8),
     ):
+        import matplotlib.pyplot as plt
+
         fig, axes = plt.subplots(len(columns), 1, figsize=figsize, sharex=True)
 
         if len(columns) == 1:
@@ -42,6 +43,8 @@ class Visualizer:
         title: str = "Predictions vs Actual",
         figsize: tuple = (12, 6),
     ):
+        import matplotlib.pyplot as plt
+
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=figsize)
 
         ax1.plot(actual, label="Actual", linewidth=2, alpha=0.7)
@@ -80,6 +83,8 @@ class Visualizer:
         title: str = "Feature Importance",
         figsize: tuple = (12, 8),
     ):
+        import matplotlib.pyplot as plt
+
         topFeatures = importance.head(top_n)
 
         fig, ax = plt.subplots(figsize=figsize)
@@ -104,6 +109,8 @@ class Visualizer:
         title: str = "Model Comparison",
         figsize: tuple = (10, 6),
     ):
+        import matplotlib.pyplot as plt
+
         modelNames = list(metrics.keys())
         values = [metrics[model].get(metricName, 0) for model in modelNames]
 
@@ -143,6 +150,8 @@ class Visualizer:
         title: str = "Crisis Timeline",
         figsize: tuple = (15, 8),
     ):
+        import matplotlib.pyplot as plt
+
         if dates is None:
             dates = pd.date_range(
                 start="2024-01-01", periods=len(predictions), freq="MS"
@@ -159,18 +168,24 @@ class Visualizer:
         ax1.legend()
         ax1.grid(True, alpha=0.3)
 
+        highThreshold = thresholds.get("high", 0.7)
+        mediumThreshold = thresholds.get("medium", 0.4)
+        crisisScores = np.asarray(crisisScores)
+        highMask = crisisScores >= highThreshold
+        mediumMask = (crisisScores >= mediumThreshold) & ~highMask
+
         ax2.plot(
             dates, crisisScores, linewidth=2, color="darkred", label="Crisis Score"
         )
         ax2.axhline(
-            y=thresholds.get("high", 0.7),
+            y=highThreshold,
             color="red",
             linestyle="--",
             linewidth=2,
             label="High Threshold",
         )
         ax2.axhline(
-            y=thresholds.get("medium", 0.4),
+            y=mediumThreshold,
             color="orange",
             linestyle="--",
             linewidth=2,
@@ -181,7 +196,7 @@ class Visualizer:
             dates,
             0,
             crisisScores,
-            where=(crisisScores >= thresholds.get("high", 0.7)),
+            where=highMask,
             color="red",
             alpha=0.3,
             label="High Risk",
@@ -190,8 +205,7 @@ class Visualizer:
             dates,
             0,
             crisisScores,
-            where=(crisisScores >= thresholds.get("medium", 0.4))
-            & (crisisScores < thresholds.get("high", 0.7)),
+            where=mediumMask,
             color="orange",
             alpha=0.3,
             label="Medium Risk",
@@ -213,6 +227,8 @@ class Visualizer:
         upper: np.ndarray,
         title: str = "Interactive Forecast",
     ):
+        import plotly.graph_objects as go
+
         forecastDates = pd.date_range(
             start=historical.index[-1], periods=len(forecast) + 1, freq="MS"
         )[1:]
@@ -269,6 +285,8 @@ class Visualizer:
         valueCol: str,
         title: str = "Spatial Heatmap",
     ):
+        import plotly.express as px
+
         fig = px.density_mapbox(
             data,
             lat=latCol,
@@ -285,7 +303,7 @@ class Visualizer:
         return fig
 
     def saveFigure(self, fig, filename: str, dpi: int = 300):
-        if isinstance(fig, go.Figure):
+        if hasattr(fig, "write_html"):
             fig.write_html(filename)
         else:
             fig.savefig(filename, dpi=dpi, bbox_inches="tight")